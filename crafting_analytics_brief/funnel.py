@@ -0,0 +1,288 @@
+"""
+Funnel - Purchase funnel diagram drawn from a config file
+Stages (columns), channels (rows), the emphasis of each channel in each stage
+and any number of customer journeys come from a JSON (or YAML) config such as
+purchase_funnel.json; nothing about the funnel is hard-coded here.
+
+Every cell goes into one PatchCollection and every journey arrow (shaft and
+head) into one LineCollection, so the figure has a handful of artists however
+many channels and journeys the config holds. The layout grows with the number
+of channels, stages and journeys.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')  # the funnel is only ever saved to file
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.patches import FancyBboxPatch
+
+from marketing_analytics import theme
+
+# Color scheme - Boston Dynamics brand colors
+COLOR_PRIMARY = theme.TEAL
+COLOR_SECONDARY = '#FFB81C'  # Boston Dynamics yellow/orange
+COLOR_HIGHLIGHT = '#003D5C'  # Dark blue
+COLOR_LIGHT = theme.LIGHT_TEAL
+
+EMPHASIS_COLORS = {'primary': COLOR_PRIMARY, 'secondary': COLOR_SECONDARY}
+
+# Journey arrows - complementary to teal: blue, purple, red, then more
+JOURNEY_COLORS = ['#3366CC', '#9933FF', '#FF3333', theme.ORANGE, '#339933', '#CC3399', '#666666', '#0099CC']
+
+DPI = theme.DPI
+
+# Layout, in data units; the 11 x 5 funnel of the brief fills an 18 x 10 inch figure
+INCHES_PER_UNIT = 10 / 12
+STAGE_X0 = 2.5               # Centre of the first stage column
+STAGE_PITCH = 1.5
+ROW_PITCH = 0.8
+HEADER_GAP = 1.0             # From the stage headers down to the first channel row
+BOX_WIDTH = 1.2
+BOX_HEIGHT = 0.6
+LEGEND_Y = 0.8
+LEGEND_PITCH = 0.22
+
+# Journey arrows, in points: an open '->' head like FancyArrowPatch draws
+ARROW_WIDTH = 3
+ARROW_HEAD_SCALE = 20
+LEGEND_HEAD_SCALE = 15
+HEAD_LENGTH = 0.4            # x head scale
+HEAD_WIDTH = 0.2             # x head scale, each side of the shaft
+ARROW_SHRINK = 2             # Gap left at both ends of an arrow
+
+
+@dataclass(frozen=True)
+class Journey:
+    label: str
+    color: str
+    channels: np.ndarray         # Channel index of each step
+    stages: np.ndarray           # Stage index of each step
+    width: object = ARROW_WIDTH  # Line width in points: one for the whole path, or one per step
+
+
+@dataclass(frozen=True)
+class Funnel:
+    title: str
+    stages: list
+    channels: list               # Channel names, top to bottom
+    descriptions: list           # One line per channel, '' if none
+    cell_channels: np.ndarray    # Channel index of each emphasized cell
+    cell_stages: np.ndarray      # Stage index of each emphasized cell
+    cell_emphasis: list          # 'primary' or 'secondary' per cell
+    journeys: tuple = ()
+    journeys_title: str = 'Customer Journeys:'
+
+
+def load_config(path):
+    """The funnel config at `path` as plain Python; YAML needs PyYAML"""
+    path = Path(path)
+    with open(path, encoding='utf-8') as fh:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            import yaml  # only YAML configs need PyYAML
+            return yaml.safe_load(fh)
+        return json.load(fh)
+
+
+def _index(names, kind):
+    lookup = {name: i for i, name in enumerate(names)}
+    if len(lookup) != len(names):
+        raise ValueError(f'duplicate {kind} names in the funnel config')
+
+    def find(name):
+        try:
+            return lookup[name]
+        except KeyError:
+            raise ValueError(f'unknown {kind} {name!r} in the funnel config') from None
+    return find
+
+
+def parse_funnel(config):
+    """Funnel from a loaded config; names are resolved to indexes once, here"""
+    stages = list(config['stages'])
+    channels = [channel['name'] for channel in config['channels']]
+    stage_index, channel_index = _index(stages, 'stage'), _index(channels, 'channel')
+
+    cell_channels, cell_stages, cell_emphasis = [], [], []
+    for row, channel in enumerate(config['channels']):
+        for stage, emphasis in channel.get('stages', {}).items():
+            if emphasis not in EMPHASIS_COLORS:
+                raise ValueError(f'unknown emphasis {emphasis!r} for {channel["name"]} / {stage}; '
+                                 f'use one of {", ".join(EMPHASIS_COLORS)}')
+            cell_channels.append(row)
+            cell_stages.append(stage_index(stage))
+            cell_emphasis.append(emphasis)
+
+    journeys = tuple(
+        Journey(
+            label=path['label'],
+            color=path['color'],
+            channels=np.array([channel_index(channel) for channel, _ in path['steps']]),
+            stages=np.array([stage_index(stage) for _, stage in path['steps']]),
+            width=path.get('width', ARROW_WIDTH),
+        )
+        for path in config.get('paths', [])
+    )
+    return Funnel(
+        title=config.get('title', 'Purchase Process Funnel'),
+        stages=stages,
+        channels=channels,
+        descriptions=[channel.get('description', '') for channel in config['channels']],
+        cell_channels=np.array(cell_channels, dtype=int),
+        cell_stages=np.array(cell_stages, dtype=int),
+        cell_emphasis=cell_emphasis,
+        journeys=journeys,
+        journeys_title=config.get('paths_title', Funnel.journeys_title),
+    )
+
+
+@dataclass(frozen=True)
+class FunnelLayout:
+    stage_x: np.ndarray          # Column centres
+    row_y: np.ndarray            # Row centres, top to bottom
+    width: float                 # x limit
+    top: float                   # y limits
+    bottom: float
+
+    @property
+    def figsize(self):
+        return (18 * self.width / 11, (self.top - self.bottom) * INCHES_PER_UNIT)
+
+
+def funnel_layout(funnel):
+    n_stages, n_channels = len(funnel.stages), len(funnel.channels)
+    stage_x = STAGE_X0 + STAGE_PITCH * np.arange(n_stages)
+    first_row = LEGEND_Y + 0.7 + ROW_PITCH * (n_channels - 1)
+    row_y = np.linspace(first_row, first_row - ROW_PITCH * (n_channels - 1), n_channels)
+    last_legend = LEGEND_Y - 0.25 - LEGEND_PITCH * (len(funnel.journeys) - 1)
+    return FunnelLayout(
+        stage_x=stage_x,
+        row_y=row_y,
+        width=stage_x[-1] + 2.5,
+        top=first_row + HEADER_GAP + 1.5,
+        bottom=min(0.0, last_legend - 0.1),
+    )
+
+
+def _arrow_lines(ax, starts, ends, widths, head_scales):
+    """
+    Shaft and open head of each arrow from `starts` to `ends` (data coordinates)
+    as data-space polylines. Sizes are in points, so this needs the final axes
+    position: call it after the layout is done.
+    """
+    to_display = ax.transData
+    start, end = to_display.transform(starts), to_display.transform(ends)
+    points = ax.figure.dpi / 72
+    direction = end - start
+    length = np.hypot(direction[:, 0], direction[:, 1])[:, None]
+    unit = direction / np.where(length > 0, length, 1)
+    normal = np.column_stack([-unit[:, 1], unit[:, 0]])
+
+    # Round caps reach half a line width past each end, so pull the ends back by that too
+    shrink = (ARROW_SHRINK + np.asarray(widths, dtype=float)[:, None] / 2) * points
+    start = start + unit * shrink
+    tip = end - unit * shrink
+    scale = np.asarray(head_scales, dtype=float)[:, None] * points
+    back = tip - unit * HEAD_LENGTH * scale
+    side = normal * HEAD_WIDTH * scale
+
+    to_data = to_display.inverted()
+    shafts = to_data.transform(np.stack([start, tip], axis=1).reshape(-1, 2)).reshape(-1, 2, 2)
+    heads = to_data.transform(np.stack([back + side, tip, back - side], axis=1).reshape(-1, 2)).reshape(-1, 3, 2)
+    return list(shafts) + list(heads)
+
+
+def _arrows(ax, starts, ends, colors, widths, head_scales, zorder):
+    """One LineCollection holding every arrow's shaft and head"""
+    colors, widths = list(colors), list(widths)
+    return ax.add_collection(LineCollection(
+        _arrow_lines(ax, starts, ends, widths, head_scales),
+        colors=colors * 2, linewidths=widths * 2, alpha=0.9, zorder=zorder,
+        capstyle='round', joinstyle='round'), autolim=False)
+
+
+def _journey_segments(funnel, layout):
+    """(starts, ends, colors, widths) of every step of every journey"""
+    starts, ends, colors, widths = [], [], [], []
+    for journey in funnel.journeys:
+        x, y = layout.stage_x[journey.stages], layout.row_y[journey.channels]
+        points = np.column_stack([x, y])
+        starts.append(points[:-1])
+        ends.append(points[1:])
+        colors += [journey.color] * (len(points) - 1)
+        widths += np.broadcast_to(journey.width, len(points) - 1).tolist()
+    if not starts:
+        return np.empty((0, 2)), np.empty((0, 2)), colors, widths
+    return np.concatenate(starts), np.concatenate(ends), colors, widths
+
+
+def render_funnel(funnel, path='purchase_funnel.png', dpi=DPI):
+    layout = funnel_layout(funnel)
+    fig, ax = plt.subplots(figsize=layout.figsize)
+    ax.set_xlim(0, layout.width)
+    ax.set_ylim(layout.bottom, layout.top)
+    ax.axis('off')
+
+    # Title
+    ax.text(layout.width / 2, layout.top - 0.5, funnel.title,
+            ha='center', va='top', fontsize=24, fontweight='bold', color=COLOR_HIGHLIGHT)
+
+    # Stage headers, then the channel labels (right-aligned)
+    header_y = layout.top - 1.5
+    for stage, x in zip(funnel.stages, layout.stage_x):
+        ax.text(x, header_y, stage, ha='center', va='center',
+                fontsize=11, fontweight='bold', color=COLOR_HIGHLIGHT)
+    ax.text(1.0, header_y, 'Channels', ha='center', va='center',
+            fontsize=11, fontweight='bold', color=COLOR_HIGHLIGHT)
+    for channel, y in zip(funnel.channels, layout.row_y):
+        ax.text(1.8, y, channel, ha='right', va='center',
+                fontsize=10, fontweight='bold', color='#333')
+
+    # Emphasized channel-stage cells and the emphasis legend swatches: one collection
+    x = layout.stage_x[funnel.cell_stages] - BOX_WIDTH/2
+    y = layout.row_y[funnel.cell_channels] - BOX_HEIGHT/2
+    boxes = [FancyBboxPatch((bx, by), BOX_WIDTH, BOX_HEIGHT, boxstyle="round,pad=0.05",
+                            facecolor=EMPHASIS_COLORS[emphasis], edgecolor='black', linewidth=1.5, alpha=0.7)
+             for bx, by, emphasis in zip(x, y, funnel.cell_emphasis)]
+
+    emphasis_x = layout.stage_x[-1] + 1.0
+    ax.text(emphasis_x, LEGEND_Y, 'Channel Emphasis:',
+            ha='left', va='center', fontsize=10, fontweight='bold', color=COLOR_HIGHLIGHT)
+    for i, (name, color) in enumerate(EMPHASIS_COLORS.items()):
+        boxes.append(FancyBboxPatch((emphasis_x, LEGEND_Y - 0.35 - 0.25*i), 0.35, 0.18,
+                                    boxstyle="round,pad=0.02",
+                                    facecolor=color, edgecolor='black', linewidth=1.5, alpha=0.7))
+        ax.text(emphasis_x + 0.45, LEGEND_Y - 0.26 - 0.25*i, name.capitalize(),
+                ha='left', va='center', fontsize=9, color='#333')
+    ax.add_collection(PatchCollection(boxes, match_original=True), autolim=False)
+
+    # Journey legend labels
+    if funnel.journeys:
+        ax.text(0.2, LEGEND_Y, funnel.journeys_title,
+                ha='left', va='center', fontsize=10, fontweight='bold', style='italic',
+                color=COLOR_HIGHLIGHT)
+    legend_y = LEGEND_Y - 0.25 - LEGEND_PITCH * np.arange(len(funnel.journeys))
+    for journey, y in zip(funnel.journeys, legend_y):
+        ax.text(0.6, y, journey.label, ha='left', va='center', fontsize=9, color='#333')
+
+    plt.tight_layout()
+
+    # Arrows are sized in points, so they are laid out once the axes are placed
+    starts, ends, colors, widths = _journey_segments(funnel, layout)
+    if len(starts):
+        # Heads grow with lines wider than the default, so thick arrows still read as arrows
+        head_scales = ARROW_HEAD_SCALE * np.maximum(1, np.asarray(widths) / ARROW_WIDTH)
+        _arrows(ax, starts, ends, colors, widths, head_scales, zorder=10)
+    if funnel.journeys:
+        _arrows(ax, np.column_stack([np.full(len(legend_y), 0.25), legend_y]),
+                np.column_stack([np.full(len(legend_y), 0.5), legend_y]),
+                [journey.color for journey in funnel.journeys], [ARROW_WIDTH] * len(legend_y),
+                [LEGEND_HEAD_SCALE] * len(legend_y), zorder=1)
+
+    plt.savefig(path, dpi=dpi, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+    return path
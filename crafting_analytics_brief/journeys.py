@@ -0,0 +1,374 @@
+"""
+Journeys - Funnel transitions and top journeys from a touchpoint event log
+Streams a CRM export (account_id, timestamp, channel, stage) in chunks and
+counts every move from one (channel, stage) cell to the next, per account, in
+time order. The channel-to-channel and stage-to-stage flows and the most
+common journeys all come from those counts, and the purchase funnel can be
+drawn from them with arrow widths proportional to volume.
+
+Memory is bounded by the number of accounts and cells, not events: per account
+only the last cell, its timestamp and the first MAX_STEPS steps are kept
+between chunks. Within a chunk every step is vectorized over integer codes
+(sorting, bincount, scatter), with no Python loop over accounts. The log must
+be in time order across chunks, as exports are; rows within a chunk may come
+in any order.
+
+Usage:
+    python journeys.py --events touchpoints.csv                       # flows and top journeys
+    python journeys.py --events touchpoints.csv --output funnel.png   # plus the funnel
+    python journeys.py --events touchpoints.csv --config purchase_funnel.json --output funnel.png
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Entry script: put the repo root on sys.path so the project modules can import
+# the shared marketing_analytics package
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+from marketing_analytics import runtime  # noqa: E402
+
+EVENT_COLUMNS = ['account_id', 'timestamp', 'channel', 'stage']
+EVENT_DTYPES = {'account_id': 'str', 'channel': 'category', 'stage': 'category'}
+DEFAULT_CHUNKSIZE = 1_000_000
+MAX_STEPS = 8                # Steps kept per journey; longer journeys are grouped by their start
+TOP_JOURNEYS = 5
+MAX_ARROW_WIDTH = 10         # Points, for the busiest step drawn
+MIN_ARROW_WIDTH = 0.75
+
+
+def _encode(index, values):
+    """
+    (codes of `values` in `index`, `index` extended by the values it lacked).
+    `values` must have no missing entries: factorize codes them -1, which would
+    pick up the last value of the index.
+    """
+    codes, uniques = pd.factorize(values)
+    known = index.get_indexer(uniques)
+    unseen = known < 0
+    if unseen.any():
+        known[unseen] = len(index) + np.arange(unseen.sum())
+        index = index.append(pd.Index(np.asarray(uniques)[unseen]))
+    return known[codes], index
+
+
+def _grow(array, size, fill):
+    """`array` with its first axis grown to at least `size` (doubling), new rows set to `fill`"""
+    if len(array) >= size:
+        return array
+    grown = np.full((max(size, 2 * len(array)),) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _group_starts(keys):
+    """True where a run of equal, adjacent `keys` begins"""
+    return np.r_[True, keys[1:] != keys[:-1]] if len(keys) else np.zeros(0, dtype=bool)
+
+
+@dataclass(frozen=True)
+class JourneyStats:
+    events: int
+    dropped: int                 # Events left out for a missing account_id, timestamp, channel or stage
+    accounts: int
+    truncated: int               # Accounts with more than MAX_STEPS steps, grouped by their first ones
+    cells: pd.DataFrame          # channel, stage, visits, mean_step (0-based) per cell code
+    transitions: np.ndarray      # Moves from cell (row) to cell (column)
+    paths: np.ndarray            # Distinct journeys as rows of cell codes (-1 padded), busiest first
+    path_accounts: np.ndarray    # Accounts that took each journey
+
+    def _flows(self, key):
+        labels = self.cells[key]
+        flows = pd.DataFrame(self.transitions, index=labels, columns=labels)
+        return flows.T.groupby(level=0, sort=False).sum().T.groupby(level=0, sort=False).sum()
+
+    @property
+    def channel_transitions(self):
+        """Moves from channel (rows) to channel (columns), any stage"""
+        return self._flows('channel')
+
+    @property
+    def stage_transitions(self):
+        """Moves from stage (rows) to stage (columns), any channel"""
+        return self._flows('stage')
+
+    def top_transitions(self, n=10):
+        """The n busiest cell-to-cell moves, as rows of from/to channel and stage and count"""
+        flat = self.transitions.ravel()
+        n = min(n, int(np.count_nonzero(flat)))
+        best = np.argpartition(-flat, n - 1)[:n] if n else np.zeros(0, dtype=int)
+        best = best[np.argsort(-flat[best], kind='stable')]
+        source, target = np.divmod(best, len(self.cells))
+        return pd.DataFrame({
+            'from_channel': self.cells['channel'].to_numpy()[source],
+            'from_stage': self.cells['stage'].to_numpy()[source],
+            'to_channel': self.cells['channel'].to_numpy()[target],
+            'to_stage': self.cells['stage'].to_numpy()[target],
+            'count': flat[best],
+        })
+
+    def top_journeys(self, k=TOP_JOURNEYS, min_steps=1):
+        """The k journeys most accounts took among those with at least `min_steps` steps"""
+        steps = (self.paths >= 0).sum(axis=1)
+        rows = np.flatnonzero(steps >= min_steps)[:k]
+        channel, stage = self.cells['channel'].to_numpy(), self.cells['stage'].to_numpy()
+        journeys = [self.paths[row][:steps[row]] for row in rows]
+        return pd.DataFrame({
+            'journey': [' → '.join(f'{channel[c]} ({stage[c]})' for c in path) for path in journeys],
+            'cells': [tuple(int(c) for c in path) for path in journeys],
+            'accounts': self.path_accounts[rows],
+        })
+
+
+class JourneyCounter:
+    """Running transition counts and journeys; feed it event chunks with update()"""
+
+    def __init__(self, max_steps=MAX_STEPS):
+        self.max_steps = max_steps
+        self.events = 0
+        self.dropped = 0
+        self.accounts = pd.Index([], dtype='str')
+        self.channels = pd.Index([], dtype='str')
+        self.stages = pd.Index([], dtype='str')
+        self.cell_keys = pd.Index([], dtype=np.int64)     # channel code << 32 | stage code
+        # Per account code
+        self.last_cell = np.full(0, -1, dtype=np.int32)
+        self.last_time = np.full(0, np.iinfo(np.int64).min, dtype=np.int64)
+        self.steps = np.zeros(0, dtype=np.int32)
+        self.paths = np.full((0, max_steps), -1, dtype=np.int32)
+        # Per cell code
+        self.transitions = np.zeros((0, 0), dtype=np.int64)
+        self.visits = np.zeros(0, dtype=np.int64)
+        self.step_sum = np.zeros(0, dtype=np.int64)
+
+    def _cells(self, chunk):
+        channel, self.channels = _encode(self.channels, chunk['channel'])
+        stage, self.stages = _encode(self.stages, chunk['stage'])
+        cell, self.cell_keys = _encode(self.cell_keys, (channel.astype(np.int64) << 32) | stage)
+        n_cells = len(self.cell_keys)
+        if n_cells > len(self.transitions):
+            grown = np.zeros((n_cells, n_cells), dtype=np.int64)
+            grown[:len(self.transitions), :len(self.transitions)] = self.transitions
+            self.transitions = grown
+            self.visits = np.pad(self.visits, (0, n_cells - len(self.visits)))
+            self.step_sum = np.pad(self.step_sum, (0, n_cells - len(self.step_sum)))
+        return cell.astype(np.int32)
+
+    def update(self, chunk):
+        """Fold one chunk of events (EVENT_COLUMNS; timestamp parsed or not) into the counts"""
+        # An event missing any column belongs to no account or cell; it is counted and left out
+        complete = chunk[EVENT_COLUMNS].notna().all(axis=1)
+        if not complete.all():
+            self.dropped += int((~complete).sum())
+            chunk = chunk[complete]
+        if chunk.empty:
+            return
+        account, self.accounts = _encode(self.accounts, chunk['account_id'])
+        cell = self._cells(chunk)
+        time = pd.to_datetime(chunk['timestamp']).to_numpy().view(np.int64)
+        n_accounts = len(self.accounts)
+        self.last_cell = _grow(self.last_cell, n_accounts, -1)
+        self.last_time = _grow(self.last_time, n_accounts, np.iinfo(np.int64).min)
+        self.steps = _grow(self.steps, n_accounts, 0)
+        self.paths = _grow(self.paths, n_accounts, -1)
+        self.events += len(chunk)
+
+        # Each account's events together, in time order (stable for equal times)
+        order = np.lexsort((time, account))
+        account, cell, time = account[order], cell[order], time[order]
+        first = _group_starts(account)
+        carried = self.last_cell[account[first]]
+        if (time[first] < self.last_time[account[first]]).any():
+            raise ValueError('the event log is not in time order across chunks; '
+                             'sort it by timestamp or raise --chunksize')
+
+        # Where each account stands at the end of this chunk, for the next one
+        last = np.r_[first[1:], True]
+        self.last_time[account[last]] = time[last]
+        self.last_cell[account[last]] = cell[last]
+
+        # The cell each event moves from: the previous event of the same account,
+        # which for its first event in this chunk is carried over from earlier chunks
+        previous = np.empty_like(cell)
+        previous[1:] = cell[:-1]
+        previous[first] = carried
+        step = cell != previous          # Repeated touches of the same cell are one step
+        moved = step & (previous >= 0)
+        n_cells = len(self.cell_keys)
+        self.transitions += np.bincount(previous[moved].astype(np.int64) * n_cells + cell[moved],
+                                        minlength=n_cells * n_cells).reshape(n_cells, n_cells)
+
+        # Step number of every step: steps so far plus its rank within the chunk
+        account, cell = account[step], cell[step]
+        starts = np.flatnonzero(_group_starts(account))
+        counts = np.diff(np.r_[starts, len(account)])
+        number = self.steps[account] + np.arange(len(account)) - np.repeat(starts, counts)
+        kept = number < self.max_steps
+        self.paths[account[kept], number[kept]] = cell[kept]
+        self.visits += np.bincount(cell, minlength=n_cells)
+        self.step_sum += np.bincount(cell, weights=number, minlength=n_cells).astype(np.int64)
+        self.steps[account[starts]] += counts.astype(np.int32)
+
+    def result(self):
+        """JourneyStats of everything folded in so far"""
+        n_accounts = len(self.accounts)
+        keys = self.cell_keys.to_numpy()
+        cells = pd.DataFrame({
+            'channel': self.channels[keys >> 32],
+            'stage': self.stages[keys & 0xFFFFFFFF],
+            'visits': self.visits,
+            'mean_step': self.step_sum / np.maximum(self.visits, 1),
+        })
+        cells.index.name = 'cell'
+
+        # Distinct journeys (their first max_steps steps), busiest first
+        paths, accounts = np.unique(self.paths[:n_accounts], axis=0, return_counts=True)
+        order = np.argsort(-accounts, kind='stable')
+        return JourneyStats(
+            events=self.events,
+            dropped=self.dropped,
+            accounts=n_accounts,
+            truncated=int((self.steps[:n_accounts] > self.max_steps).sum()),
+            cells=cells,
+            transitions=self.transitions.copy(),
+            paths=paths[order],
+            path_accounts=accounts[order],
+        )
+
+
+def read_events(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Chunks of the event log at `path` (CSV with EVENT_COLUMNS)"""
+    return pd.read_csv(path, usecols=EVENT_COLUMNS, dtype=EVENT_DTYPES, chunksize=chunksize)
+
+
+def journey_stats(path, chunksize=DEFAULT_CHUNKSIZE, max_steps=MAX_STEPS):
+    """JourneyStats of the event log at `path`, streamed `chunksize` rows at a time"""
+    counter = JourneyCounter(max_steps)
+    for chunk in read_events(path, chunksize):
+        counter.update(chunk)
+    return counter.result()
+
+
+def _order_by_step(cells, key):
+    """Values of cells[key], earliest in the journeys first (visit-weighted mean step)"""
+    weighted = cells['mean_step'] * cells['visits']
+    grouped = weighted.groupby(cells[key], sort=False).sum() / cells['visits'].groupby(cells[key], sort=False).sum()
+    return grouped.sort_values(kind='stable').index.tolist()
+
+
+def journey_funnel(stats, config=None, k=TOP_JOURNEYS):
+    """
+    Funnel of the k busiest journeys with two or more steps. Each arrow's
+    width is proportional to the number of moves along that step across all
+    accounts, so shared steps of different journeys read as equally busy.
+
+    With a funnel config the stages, channels, emphasis and title come from it
+    (every channel and stage in the log must be in it); otherwise stages and
+    channels are ordered by how early they appear in journeys, and each
+    channel's most visited stage is its primary one.
+    """
+    from funnel import JOURNEY_COLORS, Funnel, Journey, parse_funnel
+
+    cells = stats.cells
+    if config is not None:
+        base = parse_funnel({key: value for key, value in config.items() if key != 'paths'})
+    else:
+        stages, channels = _order_by_step(cells, 'stage'), _order_by_step(cells, 'channel')
+        busiest = cells.loc[cells.groupby('channel', sort=False)['visits'].idxmax()]
+        primary = set(busiest.index)
+        base = Funnel(
+            title='Purchase Process Funnel',
+            stages=stages,
+            channels=channels,
+            descriptions=[''] * len(channels),
+            cell_channels=cells['channel'].map({name: i for i, name in enumerate(channels)}).to_numpy(),
+            cell_stages=cells['stage'].map({name: i for i, name in enumerate(stages)}).to_numpy(),
+            cell_emphasis=['primary' if cell in primary else 'secondary' for cell in cells.index],
+        )
+    channel_row = cells['channel'].map({name: i for i, name in enumerate(base.channels)})
+    stage_column = cells['stage'].map({name: i for i, name in enumerate(base.stages)})
+    if channel_row.isna().any() or stage_column.isna().any():
+        missing = cells.loc[channel_row.isna() | stage_column.isna(), ['channel', 'stage']]
+        raise ValueError('cells in the event log but not in the funnel config: '
+                         + ', '.join(f'{c} / {s}' for c, s in missing.itertuples(index=False)))
+    channel_row, stage_column = channel_row.to_numpy(dtype=int), stage_column.to_numpy(dtype=int)
+
+    top = stats.top_journeys(k, min_steps=2)
+    volumes = [stats.transitions[path[:-1], path[1:]] for path in map(np.array, top['cells'])]
+    busiest = max((volume.max() for volume in volumes), default=1)
+    journeys = tuple(
+        Journey(
+            label=f'Path {i}: {" → ".join(dict.fromkeys(base.channels[c] for c in channel_row[list(path)]))} '
+                  f'({accounts:,} accounts)',
+            color=JOURNEY_COLORS[(i - 1) % len(JOURNEY_COLORS)],
+            channels=channel_row[list(path)],
+            stages=stage_column[list(path)],
+            width=np.maximum(MAX_ARROW_WIDTH * volume / busiest, MIN_ARROW_WIDTH),
+        )
+        for i, (path, accounts, volume) in enumerate(zip(top['cells'], top['accounts'], volumes), 1)
+    )
+    return Funnel(
+        title=base.title,
+        stages=base.stages,
+        channels=base.channels,
+        descriptions=base.descriptions,
+        cell_channels=base.cell_channels,
+        cell_stages=base.cell_stages,
+        cell_emphasis=base.cell_emphasis,
+        journeys=journeys,
+        journeys_title=f'Top {len(journeys)} Customer Journeys (arrow width = moves along each step):',
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Funnel transitions and top journeys from a touchpoint event log')
+    parser.add_argument('--events', required=True, metavar='CSV',
+                        help='event log with columns ' + ', '.join(EVENT_COLUMNS))
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f'events read per chunk (default: {DEFAULT_CHUNKSIZE:,})')
+    parser.add_argument('--top', type=int, default=TOP_JOURNEYS,
+                        help=f'journeys to list and draw (default: {TOP_JOURNEYS})')
+    parser.add_argument('--config', help='funnel config for stage/channel order and emphasis (JSON or YAML)')
+    parser.add_argument('--output', metavar='PNG', help='also draw the funnel of the top journeys to PNG')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stats = journey_stats(args.events, args.chunksize)
+
+    print("="*80)
+    print("CUSTOMER JOURNEYS")
+    print("="*80)
+    print(f"\nEvents: {stats.events:,}, accounts: {stats.accounts:,}, "
+          f"channel-stage cells: {len(stats.cells)}")
+    if stats.dropped:
+        print(f"Events left out for a missing account_id, timestamp, channel or stage: {stats.dropped:,}")
+    if stats.truncated:
+        print(f"Journeys longer than {MAX_STEPS} steps (grouped by their first {MAX_STEPS}): {stats.truncated:,}")
+    with pd.option_context('display.width', 120, 'display.max_columns', None):
+        print("\nStage-to-stage moves (rows: from, columns: to):")
+        print(stats.stage_transitions)
+        print("\nBusiest channel-stage moves:")
+        print(stats.top_transitions().to_string(index=False))
+    print(f"\nTop {args.top} journeys:")
+    for row in stats.top_journeys(args.top).itertuples():
+        print(f"  {row.accounts:>10,}  {row.journey}")
+
+    if args.output:
+        from funnel import load_config, render_funnel
+
+        config = load_config(args.config) if args.config else None
+        render_funnel(journey_funnel(stats, config, args.top), args.output)
+        print(f"\n✓ Saved: {args.output}")
+
+
+if __name__ == '__main__':
+    runtime.utf8_stdout()
+    main(sys.argv[1:])
@@ -0,0 +1,10 @@
+"""
+Marketing Analytics - Shared helpers for the three project scripts
+The projects stay runnable from their own folders; each script puts the repo
+root on sys.path to import from here. cli.py also runs them as the
+subcommands of one `marketing-analytics` command.
+
+Only cross-cutting helpers live here: caches, instrumentation, process setup
+and the shared palette. Each project's loading, analysis and charts stay in
+its own folder.
+"""
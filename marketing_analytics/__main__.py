@@ -0,0 +1,5 @@
+"""Lets the command line run as `python -m marketing_analytics COMMAND ...`"""
+
+from marketing_analytics.cli import main
+
+main()
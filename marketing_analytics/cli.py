@@ -0,0 +1,63 @@
+"""
+Command Line - One `marketing-analytics` command for the three project scripts
+
+    marketing-analytics brief [--config FILE] [--output PNG]
+    marketing-analytics sales [--no-charts] [--json PATH] [--format svg] ...
+    marketing-analytics story [--chunksize ROWS] [--top N] [--append CSV ...] ...
+
+Each subcommand runs its project's script from the project folder, exactly as
+`cd <folder> && python <script>.py ARGS` would, so relative paths resolve
+there. `marketing-analytics COMMAND --help` lists the script's own options.
+Only marketing_analytics is installed: the project folders, their data and
+their modules stay in the checkout, so the command needs an editable install
+(`pip install -e .`) or, after a plain `pip install .`, the repo root as the
+working directory. Anywhere else it exits with a message saying so.
+
+Only argparse is imported up front. pandas, NumPy and matplotlib come in with
+the chosen project's modules, and matplotlib only when that run draws figures
+(`sales --no-charts` never imports it), so `--help` returns at once.
+"""
+
+import argparse
+import importlib
+import sys
+
+from marketing_analytics import runtime
+
+# Subcommand -> (project folder, script module, help line)
+COMMANDS = {
+    'brief': ('crafting_analytics_brief', 'analytics_brief',
+              'render the purchase funnel of the analytics brief'),
+    'sales': ('sales_objective_analysis', 'marketing_analysis',
+              'Black Friday period-over-period KPI report and figures'),
+    'story': ('storytelling_with_data', 'storytelling_analysis',
+              'seasonality story and highlight visuals for the UK gift retailer'),
+}
+
+
+def parse_args(argv=None):
+    """Split argv into the subcommand and the arguments passed on to its script"""
+    parser = argparse.ArgumentParser(
+        prog='marketing-analytics',
+        description='Run the marketing analytics projects from one command',
+        epilog="Run 'marketing-analytics COMMAND --help' for the options of a command.")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+    for name, (_, _, help_line) in COMMANDS.items():
+        # The script parses its own options, --help included
+        commands.add_parser(name, help=help_line, add_help=False)
+    return parser.parse_known_args(argv)
+
+
+def main(argv=None):
+    args, script_argv = parse_args(argv)
+    folder, script, _ = COMMANDS[args.command]
+
+    runtime.utf8_stdout()
+    runtime.headless_matplotlib()
+    try:
+        runtime.enter_project(folder)
+    except FileNotFoundError as exc:
+        sys.exit(f'marketing-analytics: {exc}')
+    # The script's usage and error messages name the subcommand
+    sys.argv = [f'marketing-analytics {args.command}', *script_argv]
+    importlib.import_module(script).run(script_argv)
@@ -0,0 +1,68 @@
+"""
+Disk Cache - File helpers shared by the on-disk caches
+Versioned JSON manifests written atomically, size/mtime stamps of source
+files, and Parquet support checks and writes. Used by figure_cache, the
+sales workbook cache and the story cache and append state.
+
+Only the standard library is imported here; pandas is only needed by the
+frame passed to write_parquet().
+"""
+
+import json
+import os
+from pathlib import Path
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parquet_available():
+    """Parquet needs pyarrow (or fastparquet); without it the caches are bypassed"""
+    if pyarrow_available():
+        return True
+    try:
+        import fastparquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def file_state(path):
+    """Size and modification time of `path`: the cheap part of a cache key"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_manifest(path, version):
+    """The JSON object in `path`, or None if it is missing, unreadable or of another version"""
+    try:
+        with open(path, encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == version else None
+
+
+def write_json(path, data, **options):
+    """Write `data` as JSON through a temporary file, so readers never see half a file"""
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, indent=2, **options)
+    os.replace(tmp, path)
+
+
+def write_parquet(frame, path, **options):
+    """frame.to_parquet(path, **options) through a temporary file, like write_json()"""
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    frame.to_parquet(tmp, **options)
+    os.replace(tmp, path)
+    return path
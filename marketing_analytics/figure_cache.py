@@ -0,0 +1,104 @@
+"""
+Figure Cache - Skip re-rendering charts whose inputs have not changed
+Each figure is keyed on a hash of the aggregates it draws plus its style
+parameters; a figure is redrawn only when its key changes or its file is gone
+"""
+
+import hashlib
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from marketing_analytics.disk_cache import MANIFEST_NAME, file_state, read_manifest, write_json
+
+CACHE_DIR_NAME = '.figure_cache'
+CACHE_VERSION = 1
+
+
+def _feed(digest, value):
+    """Add a canonical byte form of `value` to `digest`"""
+    digest.update(type(value).__name__.encode())
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        # CSV text is deterministic, covers the index and keeps floats at full precision
+        digest.update(value.to_csv().encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif is_dataclass(value) and not isinstance(value, type):
+        for field in fields(value):
+            digest.update(field.name.encode())
+            _feed(digest, getattr(value, field.name))
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(str(len(value)).encode())
+        for item in value:
+            _feed(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def figure_key(*inputs):
+    """
+    SHA-256 over a chart's inputs: its aggregates (pandas objects, arrays,
+    dataclasses, containers or scalars) and anything that changes how it looks,
+    e.g. colors, dpi, the matplotlib version or the source of the drawing code.
+    """
+    digest = hashlib.sha256()
+    for value in inputs:
+        _feed(digest, value)
+    return digest.hexdigest()
+
+
+def source_digest(*paths):
+    """SHA-256 of source files, so editing the drawing code invalidates its figures"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def _manifest_path(path):
+    return Path(path).resolve().parent / CACHE_DIR_NAME / MANIFEST_NAME
+
+
+def _figures(manifest_path):
+    manifest = read_manifest(manifest_path, CACHE_VERSION)
+    return manifest.get('figures', {}) if manifest else {}
+
+
+def is_fresh(path, key):
+    """
+    True when `path` was last written by record() under the same key and has not
+    been replaced or deleted since; the caller can then skip rendering it.
+    """
+    entry = _figures(_manifest_path(path)).get(Path(path).name)
+    if not entry or entry.get('key') != key:
+        return False
+    try:
+        return entry.get('file') == file_state(path)
+    except OSError:
+        return False
+
+
+def record(path, key):
+    """Remember that `path` was just rendered from inputs with this key"""
+    manifest_path = _manifest_path(path)
+    figures = _figures(manifest_path)
+    figures[Path(path).name] = {'key': key, 'file': file_state(path)}
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(manifest_path, {'version': CACHE_VERSION, 'figures': figures}, sort_keys=True)
+
+
+def discard(path):
+    """Delete `path` and forget its entry, for outputs a run no longer produces"""
+    Path(path).unlink(missing_ok=True)
+    manifest_path = _manifest_path(path)
+    figures = _figures(manifest_path)
+    if figures.pop(Path(path).name, None) is not None:
+        write_json(manifest_path, {'version': CACHE_VERSION, 'figures': figures}, sort_keys=True)
@@ -0,0 +1,210 @@
+"""
+Instrumentation - Per-stage timing and memory spans for the project scripts
+Records wall time, CPU time and peak allocation for each named stage, nested
+as spans, and writes a machine-readable JSON run report
+
+Instrumentation is off unless a script enables it, so span() costs next to
+nothing in normal runs. The scripts enable it when MARKETING_ANALYTICS_PROFILE
+names a report file (marketing_analysis.py also takes --profile PATH):
+
+    MARKETING_ANALYTICS_PROFILE=run.json python storytelling_analysis.py
+
+Peak allocation comes from tracemalloc: it is the highest traced memory during
+the span minus what was allocated when it began. Allocations made outside the
+Python allocator (e.g. matplotlib's Agg canvas) are not traced.
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+PROFILE_ENV = 'MARKETING_ANALYTICS_PROFILE'
+REPORT_VERSION = 1
+
+
+class Span:
+    """One named stage: timings, peak allocation and nested child spans"""
+
+    def __init__(self, name, trace_memory):
+        self.name = name
+        self.children = []
+        self._trace_memory = trace_memory
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.wall_s = self.cpu_s = None
+        self.alloc_start = self.peak_traced = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+
+    def observe_peak(self, peak):
+        self.peak_traced = max(self.peak_traced, peak)
+
+    def close(self):
+        self.wall_s = time.perf_counter() - self._wall_start
+        self.cpu_s = time.process_time() - self._cpu_start
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'wall_s': self.wall_s,
+            'cpu_s': self.cpu_s,
+            'peak_alloc_mb': (self.peak_traced - self.alloc_start) / 1e6 if self._trace_memory else None,
+            'children': [child if isinstance(child, dict) else child.to_dict()
+                         for child in self.children],
+        }
+
+
+class Recorder:
+    """A stack of open spans under one root span covering the whole run"""
+
+    def __init__(self, name, trace_memory=True):
+        self.trace_memory = trace_memory
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.started = datetime.now(timezone.utc)
+        self.root = Span(name, trace_memory)
+        self.stack = [self.root]
+
+    def _sync_peak(self):
+        # tracemalloc keeps one global peak: fold it into the innermost open span
+        # and reset it, so each span only sees peaks from while it was innermost
+        if self.trace_memory:
+            self.stack[-1].observe_peak(tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+    def begin(self, name):
+        self._sync_peak()
+        span = Span(name, self.trace_memory)
+        self.stack[-1].children.append(span)
+        self.stack.append(span)
+        return span
+
+    def end(self):
+        if len(self.stack) == 1:
+            raise RuntimeError('end() called without a matching begin()')
+        self._sync_peak()
+        span = self.stack.pop()
+        span.close()
+        # A child's peak is also a peak of every span around it
+        self.stack[-1].observe_peak(span.peak_traced)
+        return span
+
+    def attach(self, span_dict):
+        """Add a span recorded elsewhere (e.g. in a worker process) under the current span"""
+        self.stack[-1].children.append(span_dict)
+
+    def close(self):
+        while len(self.stack) > 1:
+            self.end()
+        self._sync_peak()
+        self.root.close()
+        if self._started_tracing:
+            tracemalloc.stop()
+        return self.root
+
+    def report(self):
+        return {
+            'version': REPORT_VERSION,
+            'script': self.root.name,
+            'started': self.started.isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pid': os.getpid(),
+            'argv': sys.argv,
+            'trace_memory': self.trace_memory,
+            'run': self.root.to_dict(),
+        }
+
+
+_recorder = None
+_report_path = None
+
+
+def enable(name, report_path=None, trace_memory=True):
+    """Start recording spans for the script `name`; finish() writes the report to `report_path`"""
+    global _recorder, _report_path
+    _recorder = Recorder(name, trace_memory)
+    _report_path = report_path
+    return _recorder
+
+
+def enable_from_env(name):
+    """Enable recording if MARKETING_ANALYTICS_PROFILE names a report file"""
+    path = os.environ.get(PROFILE_ENV)
+    if path:
+        enable(name, path)
+    return enabled()
+
+
+def enabled():
+    return _recorder is not None
+
+
+def begin(name):
+    """Open a span; for straight-line script sections where a with-block does not fit"""
+    if _recorder is not None:
+        _recorder.begin(name)
+
+
+def end():
+    """Close the span opened by the matching begin()"""
+    if _recorder is not None:
+        _recorder.end()
+
+
+@contextmanager
+def span(name):
+    """Record the enclosed block as a span nested under the current one"""
+    if _recorder is None:
+        yield
+        return
+    _recorder.begin(name)
+    try:
+        yield
+    finally:
+        _recorder.end()
+
+
+def attach(span_dict):
+    if _recorder is not None and span_dict is not None:
+        _recorder.attach(span_dict)
+
+
+def call_in_span(name, fn, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) in its own recorder and return (result, span dict).
+
+    Used in worker processes: the parent attach()es the returned span so work
+    done in a pool shows up nested under the parent's current span.
+    """
+    global _recorder
+    previous = _recorder
+    _recorder = Recorder(name, trace_memory=previous.trace_memory if previous else True)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        root = _recorder.close()
+        _recorder = previous
+    span_dict = root.to_dict()
+    span_dict['pid'] = os.getpid()
+    return result, span_dict
+
+
+def finish():
+    """Close every open span and write the JSON run report; returns the report or None"""
+    global _recorder, _report_path
+    if _recorder is None:
+        return None
+    _recorder.close()
+    report = _recorder.report()
+    if _report_path:
+        with open(_report_path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nRun report written to {_report_path}")
+    _recorder = _report_path = None
+    return report
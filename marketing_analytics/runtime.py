@@ -0,0 +1,57 @@
+"""
+Runtime - Process setup shared by the project scripts and the command line
+UTF-8 console output, a file-only matplotlib backend, and running a project
+from its own folder
+
+Only the standard library is imported here, so the command line can set up
+the process before any project module pulls in pandas or matplotlib.
+"""
+
+import io
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def utf8_stdout():
+    """Print UTF-8 on Windows, whose console code page can't encode the reports' ✓ and →"""
+    if sys.platform == 'win32' and sys.stdout.encoding.lower() != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+
+def headless_matplotlib():
+    """Select the non-interactive Agg backend before matplotlib is first imported"""
+    os.environ['MPLBACKEND'] = 'Agg'
+
+
+def project_path(folder):
+    """
+    The project folder in the checkout: next to this package for a checkout or
+    an editable install, else in the working directory, since `pip install .`
+    copies only the package into site-packages. None if neither has it.
+    """
+    for root in (REPO_ROOT, Path.cwd()):
+        path = (root / folder).resolve()
+        if path.is_dir():
+            return path
+    return None
+
+
+def enter_project(folder):
+    """
+    Set up the process as `cd <folder> && python <script>.py` would: the
+    project folder becomes the working directory and is importable, so its
+    default data and output paths resolve as they do for the scripts.
+    """
+    path = project_path(folder)
+    if path is None:
+        raise FileNotFoundError(
+            f"project folder '{folder}' not found in {REPO_ROOT} or in "
+            f"{Path.cwd()}; the projects run from a checkout, so install with "
+            f"`pip install -e .` or run from the repo root")
+    os.chdir(path)
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+    return path
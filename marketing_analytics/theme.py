@@ -0,0 +1,16 @@
+"""
+Theme - The teal palette and print resolution shared by the project charts
+charts.py, story_charts.py and funnel.py build their own palettes on these, so
+the three projects keep one look; colors used by a single chart stay in that
+chart's module.
+
+Only constants live here: nothing is imported, and matplotlib is configured by
+the chart modules themselves.
+"""
+
+TEAL = '#009999'            # The base color of every project
+DARK_TEAL = '#006666'
+LIGHT_TEAL = '#E6F5F5'
+ORANGE = '#CC6600'          # Complementary to teal
+
+DPI = 300                   # Publication quality, for every saved figure
@@ -0,0 +1,210 @@
+"""
+Benchmark - Per-stage wall time and peak memory of marketing_analysis.py
+Runs each stage of the analysis on synthetic Black Friday data at several scales
+
+Stages: workbook load (.xlsx stream and Parquet cache), concat, the shared
+customer and period aggregates, each Part's aggregations, and each figure
+render. Wall time is the best of --repeat runs; peak memory is measured in a
+separate run under tracemalloc so its overhead does not skew the timings.
+
+Usage:
+    python benchmark.py                                  # 10k, 100k and 1M rows
+    python benchmark.py --scales 10k,1M,10M,50M --json bench.json
+    python benchmark.py --workbook-rows 0 --no-render    # aggregations only
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Entry script: put the repo root on sys.path so the project modules can import
+# the shared marketing_analytics package
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+from marketing_analytics.disk_cache import parquet_available  # noqa: E402
+from kpi_engine import (  # noqa: E402
+    BLACK_FRIDAY_SHEETS,
+    compare_periods,
+    compute_audience,
+    compute_marketing,
+    compute_objectives,
+    compute_products,
+    compute_retention,
+    compute_sales,
+    combine_periods,
+    customer_aggregates,
+    load_black_friday,
+)
+from synthetic_data import generate, measure_profile, write_workbook  # noqa: E402
+from workbook_loader import read_black_friday_sheets  # noqa: E402
+
+DEFAULT_SCALES = '10k,100k,1M'
+DEFAULT_WORKBOOK_ROWS = 100_000   # Writing and streaming .xlsx is slow; larger scales skip it
+_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_scale(text):
+    """'10k' -> 10000, '2.5M' -> 2500000"""
+    text = text.strip().lower().replace('_', '')
+    factor = _SUFFIXES.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * factor)
+
+
+def measure(fn, repeat=1, memory=True):
+    """Return (result, best wall seconds, peak traced bytes or None)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, best, peak
+
+
+def _stages(frames, workdir, workbook_rows, render):
+    """Yield (stage name, callable) in pipeline order; each callable's result feeds later stages"""
+    n_rows = sum(len(frame) for frame in frames.values())
+    sheets = {period: BLACK_FRIDAY_SHEETS.get(period, str(period)) for period in frames}
+
+    if n_rows <= workbook_rows:
+        workbook = workdir / 'synthetic.xlsx'
+        write_workbook(frames, workbook, sheets)
+        yield 'load: workbook (.xlsx)', lambda: read_black_friday_sheets(workbook, sheets.values())
+    if parquet_available():
+        files = {}
+        for period, frame in frames.items():
+            files[period] = workdir / f'{period}.parquet'
+            frame.to_parquet(files[period], index=False)
+        yield 'load: cache (Parquet)', lambda: {period: pd.read_parquet(f) for period, f in files.items()}
+
+    state = {}
+
+    def concat():
+        state['df'] = combine_periods(frames)
+        return state['df']
+
+    def customers():
+        state['customers'] = customer_aggregates(state['df'])
+        return state['customers']
+
+    def periods():
+        state['periods'] = compare_periods(state['df'], state['customers'])
+        return state['periods']
+
+    def part(name, fn):
+        def run():
+            state[name] = fn()
+            return state[name]
+        return run
+
+    yield 'concat', concat
+    yield 'customer aggregates', customers
+    yield 'compare periods', periods
+    yield 'part 1: objectives', part('objectives', lambda: compute_objectives(state['df'], state['periods']))
+    yield 'part 2: audience', part('audience', lambda: compute_audience(state['df'], state['periods']))
+    yield 'part 2: retention', part('retention', lambda: compute_retention(state['df'], state['customers']))
+    yield 'part 3: marketing', part('marketing', lambda: compute_marketing(state['df'], state['periods']))
+    yield 'part 4: sales', part('sales', lambda: compute_sales(state['df'], state['periods'],
+                                                                state['customers']))
+    yield 'part 5: products', part('products', lambda: compute_products(state['df']))
+
+    if render:
+        import charts
+
+        for name, render_figure, path in charts.FIGURES:
+            target = workdir / path
+            yield f'render: {path}', (lambda r=render_figure, n=name, t=target: r(state[n], t))
+
+
+def run_scale(profile, n_rows, repeat, memory, workbook_rows, render, seed):
+    frames = generate(n_rows, profile, seed=seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for stage, fn in _stages(frames, Path(tmp), workbook_rows, render):
+            _, wall, peak = measure(fn, repeat=repeat, memory=memory)
+            results.append({'rows': n_rows, 'stage': stage, 'wall_s': wall,
+                            'peak_mb': peak / 1e6 if peak is not None else None})
+            peak_text = f"{results[-1]['peak_mb']:>10.1f}" if peak is not None else f"{'-':>10}"
+            print(f"  {stage:<32} {wall:>10.4f} {peak_text}")
+    return results
+
+
+def print_summary(results, scales):
+    print("\n" + "="*80)
+    print("WALL TIME (s) BY STAGE AND SCALE")
+    print("="*80)
+    table = pd.DataFrame(results).pivot_table(index='stage', columns='rows', values='wall_s', sort=False)
+    table = table.reindex(columns=[n for n in scales if n in table.columns])
+    with pd.option_context('display.float_format', '{:.4f}'.format, 'display.width', 120):
+        print(table)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark each stage of the Black Friday analysis on synthetic data')
+    parser.add_argument('--scales', default=DEFAULT_SCALES,
+                        help=f'comma-separated row counts, e.g. 10k,1M,50M (default: {DEFAULT_SCALES})')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='timed runs per stage; the best is reported (default: 1)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the tracemalloc run that measures peak memory')
+    parser.add_argument('--workbook-rows', type=int, default=DEFAULT_WORKBOOK_ROWS,
+                        help=f'largest scale that also benchmarks the .xlsx loader (default: {DEFAULT_WORKBOOK_ROWS})')
+    parser.add_argument('--no-render', action='store_true', help='skip the figure renders')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the synthetic data')
+    parser.add_argument('--json', dest='json_path', metavar='PATH', help='write the results as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    warnings.filterwarnings('ignore')
+    scales = [parse_scale(scale) for scale in args.scales.split(',')]
+
+    # Distributions come from the sample workbook (served from its Parquet cache)
+    profile = measure_profile(load_black_friday())
+
+    results = []
+    for n_rows in scales:
+        print("\n" + "="*80)
+        print(f"SCALE: {n_rows:,} rows")
+        print("="*80)
+        print(f"  {'stage':<32} {'wall s':>10} {'peak MB':>10}")
+        results += run_scale(profile, n_rows, args.repeat, not args.no_memory,
+                             args.workbook_rows, not args.no_render, args.seed)
+
+    print_summary(results, scales)
+
+    if args.json_path:
+        report = {
+            'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                            'numpy': np.__version__, 'cpu_count': os.cpu_count()},
+            'scales': scales,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        with open(args.json_path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
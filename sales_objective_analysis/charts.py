@@ -0,0 +1,752 @@
+"""
+Charts - Black Friday period-over-period analysis
+Renders the analysis figures from the result objects in kpi_engine.py
+
+This is the only module that imports matplotlib and seaborn; marketing_analysis.py
+imports it only when charts are requested. Every chart draws one bar per period,
+so the figures follow however many periods the KPIs cover. render_all() draws
+the figures in a process pool, one figure per worker, and skips any figure
+whose inputs are unchanged since it was last written (see figure_cache).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # figures are only ever saved to file, in this process or a worker
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.colors import LinearSegmentedColormap
+
+from kpi_engine import AGE_ORDER
+
+from marketing_analytics import instrumentation, theme
+from marketing_analytics.figure_cache import figure_key, is_fresh, record, source_digest
+
+# Set style for better-looking charts
+sns.set_style("whitegrid")
+plt.rcParams['figure.figsize'] = (12, 6)
+plt.rcParams['font.size'] = 10
+
+# Define color palette - Teal theme shared with the other projects
+COLOR_PRIMARY = theme.TEAL
+COLOR_SECONDARY = theme.DARK_TEAL
+COLOR_SUCCESS = '#2ecc71'      # Green (for positive metrics)
+COLOR_WARNING = '#e74c3c'      # Red (for negative/attention)
+COLOR_NEUTRAL = '#3498db'      # Blue (for baseline/2017)
+COLOR_COMPLEMENT = theme.ORANGE
+
+
+# Create teal gradient function
+def get_teal_gradient(n_colors):
+    """Generate a gradient from light teal to dark teal"""
+    colors_list = ['#b3e5e5', '#66cccc', COLOR_PRIMARY, COLOR_SECONDARY, '#004d4d']
+    n_bins = 100
+    cmap = LinearSegmentedColormap.from_list('teal_gradient', colors_list, N=n_bins)
+    return [cmap(i) for i in np.linspace(0.2, 0.9, n_colors)]
+
+
+def period_colors(n_periods, baseline=COLOR_NEUTRAL, latest=COLOR_PRIMARY):
+    """Baseline blue vs latest teal for two periods; a teal gradient for more"""
+    if n_periods <= 2:
+        return [baseline, latest][-n_periods:]
+    return get_teal_gradient(n_periods)
+
+
+def _thousands(x, p):
+    return f'${x/1000:.0f}K'
+
+
+def _comparison(periods):
+    """'2017 vs 2018' for two periods, '2015-2018' for more: the charts plot every period"""
+    if len(periods) > 2:
+        return _span(periods)
+    return ' vs '.join(str(p) for p in periods)
+
+
+def _span(periods):
+    return f'{periods[0]}-{periods[-1]}'
+
+
+def _grouped_bars(ax, frame, colors=None, total_width=0.7):
+    """
+    Side-by-side bars: one group per row of `frame`, one bar per period column.
+
+    Returns the x positions of the groups and one bar container per period.
+    """
+    periods = frame.columns.tolist()
+    colors = colors or period_colors(len(periods))
+    x = np.arange(len(frame))
+    width = total_width / len(periods)
+    containers = []
+    for i, (period, color) in enumerate(zip(periods, colors)):
+        offset = (i - (len(periods) - 1) / 2) * width
+        containers.append(ax.bar(x + offset, frame[period], width, label=str(period),
+                                 color=color, edgecolor='black', linewidth=1))
+    return x, containers
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    dpi: int = theme.DPI
+    tight_bbox: bool = True     # Crop to the drawn content; costs an extra layout pass
+    fmt: str = 'png'            # 'png', or 'svg'/'pdf' for vector output
+
+
+FINAL = RenderSettings()                            # Publication quality
+DRAFT = RenderSettings(dpi=72, tight_bbox=False)    # Quick previews
+
+
+def _output_path(path, settings):
+    return str(Path(path).with_suffix('.' + settings.fmt))
+
+
+def _save(fig, path, settings=FINAL):
+    path = _output_path(path, settings)
+    fig.tight_layout()
+    with instrumentation.span(f'savefig {path}'):
+        fig.savefig(path, dpi=settings.dpi, bbox_inches='tight' if settings.tight_bbox else None)
+    plt.close(fig)
+    return path
+
+
+# ============================================================================
+# PART 1: OBJECTIVES
+# ============================================================================
+
+def _objective_panel(ax, values, met, change_pct, label, title):
+    periods = values.index.tolist()
+    years = [str(p) for p in periods]
+    heights = values.tolist()
+    status_color = COLOR_SUCCESS if met else COLOR_WARNING
+    colors = period_colors(len(periods))[:-1] + [status_color]
+
+    bars = ax.bar(years, heights, color=colors, edgecolor='black', linewidth=1.5)
+    ax.set_ylabel(f'{label} ($)', fontsize=12, fontweight='bold')
+    ax.set_xlabel('Year', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+
+    # Add value labels on bars
+    for bar, value in zip(bars, heights):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'${value:,.0f}',
+                ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # Add percentage change annotation between the last two bars
+    ax.annotate(f'{change_pct:+.1f}%',
+                xy=(len(periods) - 1.5, max(heights) * 0.5), xycoords='data',
+                fontsize=16, fontweight='bold', ha='center',
+                color=status_color,
+                bbox=dict(boxstyle='round,pad=0.5', facecolor='white', edgecolor='black', linewidth=2))
+
+    # Add objective status
+    status_text = '✓ OBJECTIVE MET' if met else '✗ OBJECTIVE NOT MET'
+    ax.text(0.5, 0.95, status_text, transform=ax.transAxes,
+            fontsize=12, fontweight='bold', ha='center', va='top',
+            color=status_color, bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(_thousands))
+    ax.grid(True, alpha=0.3)
+
+
+def render_objectives(objectives, path='part1_objectives.png', settings=FINAL):
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    comparison = _comparison(objectives.total_sales.index.tolist())
+
+    # Sales comparison
+    _objective_panel(axes[0], objectives.total_sales, objectives.sales_objective_met,
+                     objectives.sales_change_pct, 'Total Sales',
+                     f'Total Sales: {comparison}\nObjective: Increase by 30%')
+
+    # Ad Spend comparison
+    _objective_panel(axes[1], objectives.total_ad_spend, objectives.ad_spend_objective_met,
+                     objectives.ad_spend_change_pct, 'Total Ad Spend',
+                     f'Total Ad Spend (Paid Channel): {comparison}\nObjective: Decrease by 30%')
+
+    return _save(fig, path, settings)
+
+
+# ============================================================================
+# PART 2: AUDIENCE
+# ============================================================================
+
+def render_audience(audience, path='part2_audience.png', settings=FINAL):
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    periods = audience.unique_customers.index.tolist()
+
+    # Chart 1: Stacked bar chart - Sales by Age Range (Required)
+    ax1 = axes[0, 0]
+    x, containers = _grouped_bars(ax1, audience.sales_by_age)
+
+    ax1.set_xlabel('Age Range', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Total Sales ($)', fontsize=12, fontweight='bold')
+    ax1.set_title(f'Sales by Age Range: {_comparison(periods)}', fontsize=14, fontweight='bold', pad=20)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(AGE_ORDER)
+    ax1.legend(fontsize=11)
+    ax1.yaxis.set_major_formatter(plt.FuncFormatter(_thousands))
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            if height > 0:
+                ax1.text(bar.get_x() + bar.get_width()/2., height,
+                         f'${height/1000:.0f}K',
+                         ha='center', va='bottom', fontsize=8)
+
+    # Chart 2: Top Age Range by Total Sales (Optional)
+    ax2 = axes[0, 1]
+    top_5_ages = audience.total_sales_by_age.head(6)
+    colors_gradient = get_teal_gradient(len(top_5_ages))
+
+    bars = ax2.barh(range(len(top_5_ages)), top_5_ages.values, color=colors_gradient,
+                    edgecolor='black', linewidth=1)
+    ax2.set_yticks(range(len(top_5_ages)))
+    ax2.set_yticklabels(top_5_ages.index)
+    ax2.set_xlabel('Total Sales ($)', fontsize=12, fontweight='bold')
+    ax2.set_title(f'Total Sales by Age Range ({_span(periods)} Combined)\nRanked by Performance',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax2.xaxis.set_major_formatter(plt.FuncFormatter(_thousands))
+    ax2.grid(True, alpha=0.3, axis='x')
+
+    # Add value labels
+    for bar, value in zip(bars, top_5_ages.values):
+        width = bar.get_width()
+        ax2.text(width, bar.get_y() + bar.get_height()/2.,
+                 f' ${value:,.0f}',
+                 ha='left', va='center', fontsize=10, fontweight='bold')
+
+    # Highlight the winner
+    ax2.text(0.98, 0.98, f'Winner: {top_5_ages.index[0]}',
+             transform=ax2.transAxes, fontsize=12, fontweight='bold',
+             ha='right', va='top', color=COLOR_SUCCESS,
+             bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+
+    # Chart 3: Repeat Customers Analysis (Optional)
+    ax3 = axes[1, 0]
+    customer_types = pd.DataFrame([audience.one_time_customers, audience.repeat_customers],
+                                  index=['One-Time\nCustomers', 'Repeat\nCustomers'])
+    x, containers = _grouped_bars(ax3, customer_types)
+
+    ax3.set_ylabel('Number of Customers', fontsize=12, fontweight='bold')
+    ax3.set_title(f'Repeat vs One-Time Customers: {_comparison(periods)}',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax3.set_xticks(x)
+    ax3.set_xticklabels(customer_types.index)
+    ax3.legend(fontsize=11)
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels and percentages
+    for bars, total in zip(containers, audience.unique_customers):
+        for bar in bars:
+            height = bar.get_height()
+            pct = (height / total) * 100
+            ax3.text(bar.get_x() + bar.get_width()/2., height,
+                     f'{int(height)}\n({pct:.1f}%)',
+                     ha='center', va='bottom', fontsize=9, fontweight='bold')
+
+    # Chart 4: Average Orders per Customer
+    ax4 = axes[1, 1]
+    years = [str(p) for p in periods]
+    avg_orders = audience.avg_orders_per_customer.tolist()
+
+    bars = ax4.bar(years, avg_orders, color=period_colors(len(periods)), edgecolor='black', linewidth=1.5)
+    ax4.set_ylabel('Average Orders per Customer', fontsize=12, fontweight='bold')
+    ax4.set_xlabel('Year', fontsize=12, fontweight='bold')
+    ax4.set_title('Average Order Volume per Customer', fontsize=14, fontweight='bold', pad=20)
+    ax4.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bar, value in zip(bars, avg_orders):
+        height = bar.get_height()
+        ax4.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{value:.2f}',
+                 ha='center', va='bottom', fontsize=12, fontweight='bold')
+
+    # Add change annotation
+    ax4.text(0.5, 0.95, f'Change: {audience.avg_orders_change_pct:+.1f}%',
+             transform=ax4.transAxes, fontsize=11, fontweight='bold',
+             ha='center', va='top', bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
+
+    return _save(fig, path, settings)
+
+
+# ============================================================================
+# PART 2: CROSS-PERIOD RETENTION
+# ============================================================================
+
+RETENTION_COLORS = [COLOR_PRIMARY, COLOR_WARNING, COLOR_SUCCESS]    # Retained, churned, new
+RETENTION_LABELS = ['Retained', 'Churned', 'New']
+
+
+def render_retention(retention, path='part2_retention.png', settings=FINAL):
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    transitions = [f'{previous} → {period}' for period, previous in retention.previous_period.items()]
+
+    # Chart 1: Customers kept, lost and gained
+    ax1 = axes[0]
+    customers = retention.customers.set_axis(transitions).set_axis(RETENTION_LABELS, axis=1)
+    x, containers = _grouped_bars(ax1, customers, colors=RETENTION_COLORS)
+
+    ax1.set_ylabel('Number of Customers', fontsize=12, fontweight='bold')
+    ax1.set_title('Customers Retained, Churned and New\nfrom One Period to the Next',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(transitions)
+    ax1.legend(fontsize=11)
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            ax1.text(bar.get_x() + bar.get_width()/2., height,
+                     f'{int(height):,}',
+                     ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    # Retention rate of each transition, above the bars
+    ax1.margins(y=0.2)
+    ax1.text(0.5, 0.95, '\n'.join(f'{t}: {rate:.1f}% retained'
+                                   for t, rate in zip(transitions, retention.retention_rate_pct)),
+             transform=ax1.transAxes, fontsize=11, fontweight='bold',
+             ha='center', va='top', bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+
+    # Chart 2: Their revenue
+    ax2 = axes[1]
+    revenue = retention.revenue.set_axis(transitions).set_axis(RETENTION_LABELS, axis=1)
+    x, containers = _grouped_bars(ax2, revenue, colors=RETENTION_COLORS)
+
+    ax2.set_ylabel('Total Sales ($)', fontsize=12, fontweight='bold')
+    ax2.set_title('Revenue by Customer Status\nChurned = Spend in the Earlier Period',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(transitions)
+    ax2.legend(fontsize=11)
+    ax2.yaxis.set_major_formatter(plt.FuncFormatter(_thousands))
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            ax2.text(bar.get_x() + bar.get_width()/2., height,
+                     f'${height/1000:.0f}K',
+                     ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    return _save(fig, path, settings)
+
+
+# ============================================================================
+# PART 3: MARKETING
+# ============================================================================
+
+def render_marketing(marketing, path='part3_marketing.png', settings=FINAL):
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    roi = marketing.roi
+    periods = roi.index.tolist()
+    sales_by_channel = marketing.sales_by_channel
+
+    # Chart 1: ROI on Paid Channel (Required)
+    ax1 = axes[0, 0]
+    years = [str(p) for p in periods]
+    roi_values = roi.tolist()
+    colors = [color if value > 0 else COLOR_WARNING
+              for color, value in zip(period_colors(len(periods)), roi_values)]
+
+    bars = ax1.bar(years, roi_values, color=colors, edgecolor='black', linewidth=1.5)
+    ax1.axhline(y=0, color='black', linestyle='-', linewidth=1)
+    ax1.set_ylabel('ROI (%)', fontsize=12, fontweight='bold')
+    ax1.set_xlabel('Year', fontsize=12, fontweight='bold')
+    ax1.set_title('Return on Investment (ROI) - Paid Channel\nROI = (Revenue - Cost) / Cost × 100%',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bar, value in zip(bars, roi_values):
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{value:.1f}%',
+                 ha='center', va='bottom' if value > 0 else 'top',
+                 fontsize=12, fontweight='bold')
+
+    # Add status for the latest period
+    status_text = 'ROI POSITIVE ✓' if roi_values[-1] > 0 else 'ROI NEGATIVE ✗'
+    status_color = 'green' if roi_values[-1] > 0 else 'red'
+    ax1.text(0.5, 0.95, status_text, transform=ax1.transAxes,
+             fontsize=12, fontweight='bold', ha='center', va='top',
+             color=status_color, bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+
+    # Chart 2: CPA by Age Range (Required)
+    ax2 = axes[0, 1]
+    x, containers = _grouped_bars(ax2, marketing.cpa_by_age)
+
+    ax2.set_xlabel('Age Range', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Average CPA ($)', fontsize=12, fontweight='bold')
+    ax2.set_title('Cost Per Acquisition (CPA) by Age Range\nLower is Better',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(AGE_ORDER)
+    ax2.legend(fontsize=11)
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            if not np.isnan(height) and height > 0:
+                ax2.text(bar.get_x() + bar.get_width()/2., height,
+                         f'${height:.0f}',
+                         ha='center', va='bottom', fontsize=8)
+
+    # Highlight best performers
+    best = marketing.best_cpa_age
+    ax2.text(0.98, 0.98, '\n'.join(f'{p} Best: {best[p]}' for p in periods),
+             transform=ax2.transAxes, fontsize=10, fontweight='bold',
+             ha='right', va='top', bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+
+    # Chart 3: Sales by Channel - Stacked (Optional)
+    ax3 = axes[1, 0]
+    channels = sales_by_channel.index.tolist()
+    x, containers = _grouped_bars(ax3, sales_by_channel)
+
+    ax3.set_xlabel('Customer Source', fontsize=12, fontweight='bold')
+    ax3.set_ylabel('Total Sales ($)', fontsize=12, fontweight='bold')
+    ax3.set_title(f'Total Sales by Marketing Channel: {_comparison(periods)}',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax3.set_xticks(x)
+    ax3.set_xticklabels(channels)
+    ax3.legend(fontsize=11)
+    ax3.yaxis.set_major_formatter(plt.FuncFormatter(_thousands))
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            if height > 0:
+                ax3.text(bar.get_x() + bar.get_width()/2., height,
+                         f'${height/1000:.0f}K',
+                         ha='center', va='bottom', fontsize=9)
+
+    # Chart 4: Channel Performance Comparison
+    ax4 = axes[1, 1]
+    channel_growth = marketing.channel_growth.tolist()
+
+    colors_growth = [COLOR_SUCCESS if g > 0 else COLOR_WARNING for g in channel_growth]
+    bars = ax4.barh(channels, channel_growth, color=colors_growth, edgecolor='black', linewidth=1)
+    ax4.axvline(x=0, color='black', linestyle='-', linewidth=1)
+    ax4.set_xlabel('Growth Rate (%)', fontsize=12, fontweight='bold')
+    ax4.set_title(f'Channel Growth Rate: {periods[-2]} to {periods[-1]}',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax4.grid(True, alpha=0.3, axis='x')
+
+    # Add value labels
+    for bar, value in zip(bars, channel_growth):
+        width = bar.get_width()
+        ax4.text(width, bar.get_y() + bar.get_height()/2.,
+                 f' {value:+.1f}%',
+                 ha='left' if value > 0 else 'right', va='center',
+                 fontsize=10, fontweight='bold')
+
+    return _save(fig, path, settings)
+
+
+# ============================================================================
+# PART 4: SALES
+# ============================================================================
+
+def render_sales(sales, path='part4_sales.png', settings=FINAL):
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    periods = sales.revenue.index.tolist()
+    years = [str(p) for p in periods]
+    colors = period_colors(len(periods))
+
+    # Chart 1: Total Revenue Comparison (Required)
+    ax1 = axes[0, 0]
+    revenues = sales.revenue.tolist()
+
+    bars = ax1.bar(years, revenues, color=colors, edgecolor='black', linewidth=1.5)
+    ax1.set_ylabel('Total Revenue ($)', fontsize=12, fontweight='bold')
+    ax1.set_xlabel('Year', fontsize=12, fontweight='bold')
+    ax1.set_title(f'Total Revenue Generated: {_comparison(periods)}', fontsize=14, fontweight='bold', pad=20)
+    ax1.yaxis.set_major_formatter(plt.FuncFormatter(_thousands))
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bar, value in zip(bars, revenues):
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                 f'${value:,.0f}',
+                 ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # Add growth annotation
+    ax1.text(0.5, 0.5, f'+{sales.revenue_growth_pct:.1f}%', transform=ax1.transAxes,
+             fontsize=18, fontweight='bold', ha='center', va='center',
+             color=COLOR_SUCCESS, bbox=dict(boxstyle='round', facecolor='white',
+                                            edgecolor='black', linewidth=2))
+
+    # Chart 2: Average Order Amount (Optional)
+    ax2 = axes[0, 1]
+    avg_orders = sales.avg_order.tolist()
+
+    bars = ax2.bar(years, avg_orders, color=colors, edgecolor='black', linewidth=1.5)
+    ax2.set_ylabel('Average Order Amount ($)', fontsize=12, fontweight='bold')
+    ax2.set_xlabel('Year', fontsize=12, fontweight='bold')
+    ax2.set_title(f'Average Order Amount: {_comparison(periods)}', fontsize=14, fontweight='bold', pad=20)
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bar, value in zip(bars, avg_orders):
+        height = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., height,
+                 f'${value:.2f}',
+                 ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # Add change annotation
+    ax2.text(0.5, 0.95, f'Change: {sales.avg_order_change_pct:+.1f}%', transform=ax2.transAxes,
+             fontsize=11, fontweight='bold', ha='center', va='top',
+             bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
+
+    # Chart 3: Top 10 Customers by Revenue (Optional)
+    ax3 = axes[1, 0]
+    top_10_customers = sales.top_10_customers
+    colors_gradient = get_teal_gradient(len(top_10_customers))
+
+    bars = ax3.barh(range(len(top_10_customers)), top_10_customers.values,
+                    color=colors_gradient, edgecolor='black', linewidth=1)
+    ax3.set_yticks(range(len(top_10_customers)))
+    ax3.set_yticklabels([f'User {uid}' for uid in top_10_customers.index])
+    ax3.set_xlabel('Total Spending ($)', fontsize=12, fontweight='bold')
+    ax3.set_title(f'Top 10 Customers by Total Spending ({_span(periods)})',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax3.grid(True, alpha=0.3, axis='x')
+
+    # Add value labels
+    for bar, value in zip(bars, top_10_customers.values):
+        width = bar.get_width()
+        ax3.text(width, bar.get_y() + bar.get_height()/2.,
+                 f' ${value:,.0f}',
+                 ha='left', va='center', fontsize=9, fontweight='bold')
+
+    # Highlight top customer
+    ax3.text(0.98, 0.98, f'Top Spender: User {top_10_customers.index[0]}',
+             transform=ax3.transAxes, fontsize=11, fontweight='bold',
+             ha='right', va='top', color='gold',
+             bbox=dict(boxstyle='round', facecolor='black', alpha=0.8))
+
+    # Chart 4: Key sales metrics
+    # Since this is Black Friday data, show number of transactions and average order value
+    ax4 = axes[1, 1]
+    key_metrics = pd.DataFrame([sales.transactions, sales.avg_order, sales.revenue / 1000],
+                               index=['Total\nTransactions', 'Avg Order\nValue', 'Total\nRevenue'])
+    x, containers = _grouped_bars(ax4, key_metrics,
+                                  colors=period_colors(len(periods), '#3498db', '#2ecc71'))
+
+    ax4.set_ylabel('Value', fontsize=12, fontweight='bold')
+    ax4.set_title('Key Sales Metrics Comparison', fontsize=14, fontweight='bold', pad=20)
+    ax4.set_xticks(x)
+    ax4.set_xticklabels(key_metrics.index)
+    ax4.legend(fontsize=11)
+    ax4.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels with proper formatting
+    label_formats = [lambda v: f'{int(v):,}', lambda v: f'${v:.2f}', lambda v: f'${v:.0f}K']
+    for bars, period in zip(containers, periods):
+        for bar, value, fmt in zip(bars, key_metrics[period], label_formats):
+            ax4.text(bar.get_x() + bar.get_width()/2., bar.get_height(),
+                     fmt(value), ha='center', va='bottom', fontsize=9, fontweight='bold')
+
+    return _save(fig, path, settings)
+
+
+# ============================================================================
+# PART 5: PRODUCT CATEGORIES
+# ============================================================================
+
+def render_products(products, path='part5_products.png', settings=FINAL):
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    product_sales = products.product_sales
+    cpa_by_product = products.cpa_by_product
+    leaders = products.most_popular_by_sales
+    periods = product_sales.columns.tolist()
+
+    # Chart 1: Sales by Product Category - Stacked (Required + Optional)
+    ax1 = axes[0, 0]
+    categories = product_sales.index.tolist()
+    x, containers = _grouped_bars(ax1, product_sales)
+
+    ax1.set_xlabel('Product Category', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Total Sales ($)', fontsize=12, fontweight='bold')
+    ax1.set_title(f'Total Sales by Product Category: {_comparison(periods)}',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(categories, rotation=0)
+    ax1.legend(fontsize=11)
+    ax1.yaxis.set_major_formatter(plt.FuncFormatter(_thousands))
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            if height > 0:
+                ax1.text(bar.get_x() + bar.get_width()/2., height,
+                         f'${height/1000:.0f}K',
+                         ha='center', va='bottom', fontsize=8)
+
+    # Highlight winners
+    ax1.text(0.98, 0.98, '\n'.join(f'{p} Leader: {leaders[p]}' for p in periods),
+             transform=ax1.transAxes, fontsize=10, fontweight='bold',
+             ha='right', va='top', bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+
+    # Chart 2: Transaction Count by Product Category (Required)
+    ax2 = axes[0, 1]
+    x, containers = _grouped_bars(ax2, products.product_transactions)
+
+    ax2.set_xlabel('Product Category', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Number of Transactions', fontsize=12, fontweight='bold')
+    ax2.set_title(f'Transaction Volume by Product Category: {_comparison(periods)}',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(categories, rotation=0)
+    ax2.legend(fontsize=11)
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            if height > 0:
+                ax2.text(bar.get_x() + bar.get_width()/2., height,
+                         f'{int(height):,}',
+                         ha='center', va='bottom', fontsize=8)
+
+    # Chart 3: CPA by Product Category (Optional)
+    ax3 = axes[1, 0]
+    x_cpa, containers = _grouped_bars(ax3, cpa_by_product)
+
+    ax3.set_xlabel('Product Category', fontsize=12, fontweight='bold')
+    ax3.set_ylabel('Average CPA ($)', fontsize=12, fontweight='bold')
+    ax3.set_title('Cost Per Acquisition by Product Category\nLower is Better',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax3.set_xticks(x_cpa)
+    ax3.set_xticklabels(cpa_by_product.index.tolist(), rotation=0)
+    ax3.legend(fontsize=11)
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bars in containers:
+        for bar in bars:
+            height = bar.get_height()
+            if not np.isnan(height) and height > 0:
+                ax3.text(bar.get_x() + bar.get_width()/2., height,
+                         f'${height:.0f}',
+                         ha='center', va='bottom', fontsize=8)
+
+    # Chart 4: Product Category Growth Rate (sorted by growth rate)
+    ax4 = axes[1, 1]
+    sorted_categories = products.category_growth.index.tolist()
+    sorted_growth = products.category_growth.tolist()
+
+    colors_growth = [COLOR_SUCCESS if g > 0 else COLOR_WARNING for g in sorted_growth]
+    bars = ax4.barh(sorted_categories, sorted_growth, color=colors_growth,
+                    edgecolor='black', linewidth=1)
+    ax4.axvline(x=0, color='black', linestyle='-', linewidth=1)
+    ax4.set_xlabel('Growth Rate (%)', fontsize=12, fontweight='bold')
+    ax4.set_title(f'Product Category Growth Rate: {periods[-2]} to {periods[-1]}\nRanked by Performance',
+                  fontsize=14, fontweight='bold', pad=20)
+    ax4.grid(True, alpha=0.3, axis='x')
+
+    # Add value labels
+    for bar, value in zip(bars, sorted_growth):
+        width_bar = bar.get_width()
+        ax4.text(width_bar, bar.get_y() + bar.get_height()/2.,
+                 f' {value:+.1f}%',
+                 ha='left' if value > 0 else 'right', va='center',
+                 fontsize=10, fontweight='bold')
+
+    # Highlight best performer
+    ax4.text(0.98, 0.98, f'Best Growth:\n{sorted_categories[0]}',
+             transform=ax4.transAxes, fontsize=11, fontweight='bold',
+             ha='right', va='top', color=COLOR_SUCCESS,
+             bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+
+    return _save(fig, path, settings)
+
+
+# ============================================================================
+# RENDERING STAGE
+# ============================================================================
+
+# (AnalysisKPIs field, render function, default file), in report order
+FIGURES = (
+    ('objectives', render_objectives, 'part1_objectives.png'),
+    ('audience', render_audience, 'part2_audience.png'),
+    ('retention', render_retention, 'part2_retention.png'),
+    ('marketing', render_marketing, 'part3_marketing.png'),
+    ('sales', render_sales, 'part4_sales.png'),
+    ('products', render_products, 'part5_products.png'),
+)
+
+
+def _style_key(settings):
+    """Everything besides the KPIs that changes how a figure looks"""
+    return (settings, matplotlib.__version__, sns.__version__, source_digest(__file__))
+
+
+def render_all(kpis, settings=FINAL, max_workers=None, use_cache=True):
+    """
+    Render every figure from a precomputed AnalysisKPIs in a process pool,
+    one figure per worker, yielding (path, rendered) in report order.
+    `settings` picks the output quality (FINAL or DRAFT) and file format.
+
+    The figures share nothing, so chart generation takes about as long as the
+    slowest one. max_workers=1 renders them one after another in this process.
+    With use_cache, a figure whose KPIs, settings and drawing code are unchanged
+    since it was last written is left on disk as is (rendered=False).
+    """
+    style = _style_key(settings)
+    jobs = []
+    for name, render, path in FIGURES:
+        part = getattr(kpis, name)
+        target = _output_path(path, settings)
+        key = figure_key(part, style)
+        jobs.append((render, part, target, key, use_cache and is_fresh(target, key)))
+
+    stale = sum(not fresh for *_, fresh in jobs)
+    max_workers = min(stale, max_workers or os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    # With instrumentation on, each worker records its own spans and hands them
+    # back to be nested under whatever span is open here
+    traced = instrumentation.enabled()
+    try:
+        futures = {}
+        for render, part, target, _, fresh in jobs:
+            if pool and not fresh:
+                futures[target] = (pool.submit(instrumentation.call_in_span, f'render {target}',
+                                               render, part, target, settings) if traced
+                                   else pool.submit(render, part, target, settings))
+        for render, part, target, key, fresh in jobs:
+            if fresh:
+                yield target, False
+                continue
+            if pool:
+                saved = futures[target].result()
+                if traced:
+                    saved, render_span = saved
+                    instrumentation.attach(render_span)
+            else:
+                with instrumentation.span(f'render {target}'):
+                    saved = render(part, target, settings)
+            record(saved, key)
+            yield saved, True
+    finally:
+        if pool:
+            pool.shutdown()
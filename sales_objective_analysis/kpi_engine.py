@@ -0,0 +1,495 @@
+"""
+KPI Engine - Black Friday period-over-period analysis
+Pure computations behind Parts 1-5 of marketing_analysis.py
+
+Importing this module does not import matplotlib or seaborn, so schedulers that
+only need the numbers never pay for the plotting stack. Every compute_* function
+takes the combined frame (one row per order, with a 'Year' column holding the
+period label) and returns a frozen result object; per-period values are pandas
+Series indexed by Year. Any number of periods is supported: headline changes
+compare the latest period with the one before it.
+"""
+
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from workbook_cache import load_sheets
+from workbook_loader import AGE_ORDER, BLACK_FRIDAY_SCHEMA, read_black_friday_sheets, schema_key
+
+WORKBOOK_PATH = 'Project_ Create a Proposal for the Next Quarter  - Sample_Dataset.xlsx'
+
+# Period label -> sheet name, oldest first. Add entries (e.g. more years, or
+# 'Cyber Monday 2018') to compare more periods; nothing else needs to change.
+BLACK_FRIDAY_SHEETS = {2017: '2017 Black Friday', 2018: '2018 Black Friday'}
+
+SALES_OBJECTIVE_PCT = 30         # Sales should grow by at least 30%
+AD_SPEND_OBJECTIVE_PCT = -30     # Paid-channel ad spend should fall by at least 30%
+
+# Decimal places of the float32 amount columns in the source workbook; float32
+# keeps 7 significant digits, so widening and rounding recovers the exact values
+AMOUNT_DECIMALS = {'Order Amount': 2, 'CPA': 4}
+
+
+def load_black_friday(path=WORKBOOK_PATH, sheets=BLACK_FRIDAY_SHEETS):
+    """
+    Load the period sheets into one frame with a 'Year' column.
+
+    `sheets` maps each period label to its sheet name, oldest first. Sheets are
+    read in one streaming pass and served from the Parquet cache when the
+    workbook is unchanged. Dimension columns (and 'Year') are Categoricals
+    shared across sheets, and amounts are float32, per BLACK_FRIDAY_SCHEMA.
+    """
+    frames = load_sheets(path, sheets.values(), reader=read_black_friday_sheets,
+                         reader_key=schema_key(BLACK_FRIDAY_SCHEMA))
+    return combine_periods({period: frames[sheet_name] for period, sheet_name in sheets.items()})
+
+
+def combine_periods(frames):
+    """
+    Concatenate {period label: frame} (oldest first, columns per
+    BLACK_FRIDAY_SCHEMA) into one frame with a categorical 'Year' column.
+    """
+    parts = list(frames.values())
+
+    # Sheets with different 'category' values get the sorted union, so concat
+    # keeps the columns categorical instead of falling back to object
+    for name, dtype in BLACK_FRIDAY_SCHEMA.items():
+        if dtype == 'category' and not isinstance(dtype, pd.CategoricalDtype):
+            union = sorted(set().union(*(part[name].cat.categories for part in parts)))
+            for part in parts:
+                part[name] = part[name].cat.set_categories(union)
+
+    df = pd.concat(parts, ignore_index=True)
+    year_codes = np.repeat(np.arange(len(parts), dtype=np.int16), [len(part) for part in parts])
+    df['Year'] = pd.Categorical.from_codes(year_codes, categories=list(frames))
+    return df
+
+
+def _period_pct_change(values, axis=0):
+    """% change from each period to the next along `axis` (NaN for the first period)"""
+    previous = values.shift(1, axis=axis)
+    return ((values - previous) / previous) * 100
+
+
+def _pct_change(values):
+    """% change from the previous period to the latest one of a per-period Series"""
+    return _period_pct_change(values).iloc[-1]
+
+
+def _latest_growth(frame):
+    """% change per row of a (category x period) frame, previous to latest period"""
+    return _period_pct_change(frame, axis=1).iloc[:, -1]
+
+
+def _is_paid(df):
+    return df['Customer Source'] == 'Paid'
+
+
+def _paid(df):
+    return df[_is_paid(df)]
+
+
+def _amounts(df, column):
+    """
+    `column` widened to float64.
+
+    Amounts are stored as float32 but rounded back to their source decimals
+    before accumulating, so totals match the workbook to the cent.
+    """
+    values = df[column].astype('float64')
+    if column in AMOUNT_DECIMALS:
+        values = values.round(AMOUNT_DECIMALS[column])
+    return values
+
+
+def _grouped(df, keys, column):
+    """Group `column` by `keys` on the categorical codes (observed groups only)"""
+    keys = [df[key] for key in ([keys] if isinstance(keys, str) else keys)]
+    return _amounts(df, column).groupby(keys if len(keys) > 1 else keys[0], observed=True)
+
+
+def _counts(df, keys):
+    return df.groupby(keys, observed=True).size()
+
+
+def customer_aggregates(df):
+    """
+    One row per (Year, User ID) with the customer's order count and revenue.
+
+    Built with a single groupby; every customer-level KPI in Parts 2 and 4 is
+    derived from this table instead of regrouping the order rows.
+    """
+    return _grouped(df, ['Year', 'User ID'], 'Order Amount').agg(orders='size', revenue='sum')
+
+
+# ============================================================================
+# PERIOD COMPARISON
+# ============================================================================
+
+@dataclass(frozen=True)
+class PeriodComparison:
+    metrics: pd.DataFrame        # Period x metric
+    changes: pd.DataFrame        # Absolute change from the previous period
+    pct_changes: pd.DataFrame    # % change from the previous period
+
+    @property
+    def periods(self):
+        return self.metrics.index.tolist()
+
+
+def compare_periods(df, customers=None):
+    """
+    Every per-period scalar KPI for all periods, with period-over-period deltas.
+
+    The order-level metrics come from a single grouped pass over the combined
+    frame (Paid-channel figures are masked columns in the same pass); customer
+    metrics come from the much smaller customer_aggregates() table. Deltas are
+    vectorized shifts over the period axis.
+    """
+    if customers is None:
+        customers = customer_aggregates(df)
+
+    is_paid = _is_paid(df)
+    amount = _amounts(df, 'Order Amount')
+    columns = pd.DataFrame({
+        'amount': amount,
+        'paid_amount': amount.where(is_paid),
+        # CPA exists only for the Paid channel
+        'paid_cpa': _amounts(df, 'CPA').where(is_paid),
+    })
+    metrics = columns.groupby(df['Year'], observed=True).agg(
+        revenue=('amount', 'sum'),
+        transactions=('amount', 'size'),
+        avg_order=('amount', 'mean'),
+        paid_revenue=('paid_amount', 'sum'),
+        ad_spend=('paid_cpa', 'sum'),
+    )
+    metrics['roi'] = ((metrics['paid_revenue'] - metrics['ad_spend']) / metrics['ad_spend']) * 100
+
+    orders = customers['orders'].groupby(level='Year', observed=True)
+    metrics['unique_customers'] = orders.size()
+    metrics['repeat_customers'] = (customers['orders'] > 1).groupby(level='Year', observed=True).sum()
+    metrics['avg_orders_per_customer'] = orders.mean()
+
+    return PeriodComparison(
+        metrics=metrics,
+        changes=metrics.diff(),
+        pct_changes=_period_pct_change(metrics),
+    )
+
+
+# ============================================================================
+# PART 1: OBJECTIVES
+# ============================================================================
+
+@dataclass(frozen=True)
+class ObjectivesKPIs:
+    total_sales: pd.Series       # Order Amount by Year
+    total_ad_spend: pd.Series    # Paid-channel CPA by Year
+    sales_change_pct: float      # Latest period vs the previous one
+    ad_spend_change_pct: float
+
+    @property
+    def sales_objective_met(self):
+        return self.sales_change_pct >= SALES_OBJECTIVE_PCT
+
+    @property
+    def ad_spend_objective_met(self):
+        return self.ad_spend_change_pct <= AD_SPEND_OBJECTIVE_PCT
+
+
+def compute_objectives(df, periods=None):
+    """`periods` is the compare_periods() result; built from `df` if omitted"""
+    if periods is None:
+        periods = compare_periods(df)
+    return ObjectivesKPIs(
+        total_sales=periods.metrics['revenue'],
+        total_ad_spend=periods.metrics['ad_spend'],
+        sales_change_pct=periods.pct_changes['revenue'].iloc[-1],
+        ad_spend_change_pct=periods.pct_changes['ad_spend'].iloc[-1],
+    )
+
+
+# ============================================================================
+# PART 2: AUDIENCE
+# ============================================================================
+
+@dataclass(frozen=True)
+class AudienceKPIs:
+    sales_by_age: pd.DataFrame        # Age Range x Year, in AGE_ORDER
+    total_sales_by_age: pd.Series     # All periods combined, best first
+    repeat_customers: pd.Series       # Customers with more than one order, by Year
+    unique_customers: pd.Series       # Distinct User IDs, by Year
+    avg_orders_per_customer: pd.Series
+
+    @property
+    def one_time_customers(self):
+        return self.unique_customers - self.repeat_customers
+
+    @property
+    def repeat_rate_pct(self):
+        return self.repeat_customers / self.unique_customers * 100
+
+    @property
+    def avg_orders_change_pct(self):
+        return _pct_change(self.avg_orders_per_customer)
+
+
+def compute_audience(df, periods=None):
+    """`periods` is the compare_periods() result; built from `df` if omitted"""
+    if periods is None:
+        periods = compare_periods(df)
+    sales_by_age = _grouped(df, ['Year', 'Age Range'], 'Order Amount').sum().unstack(level=0)
+    sales_by_age = sales_by_age.reindex(AGE_ORDER)
+    total_sales_by_age = _grouped(df, 'Age Range', 'Order Amount').sum().sort_values(ascending=False)
+
+    return AudienceKPIs(
+        sales_by_age=sales_by_age,
+        total_sales_by_age=total_sales_by_age,
+        repeat_customers=periods.metrics['repeat_customers'],
+        unique_customers=periods.metrics['unique_customers'],
+        avg_orders_per_customer=periods.metrics['avg_orders_per_customer'],
+    )
+
+
+# ============================================================================
+# PART 2: CROSS-PERIOD RETENTION
+# ============================================================================
+
+@dataclass(frozen=True)
+class RetentionKPIs:
+    customers: pd.DataFrame      # retained / churned / new customers, by Year from the second period on
+    revenue: pd.DataFrame        # Their spend: retained and new in that period, churned in the one before
+    previous_period: pd.Series   # The period each Year is compared with
+
+    @property
+    def previous_customers(self):
+        return self.customers['retained'] + self.customers['churned']
+
+    @property
+    def retention_rate_pct(self):
+        """Share of the previous period's customers who bought again, by Year"""
+        return self.customers['retained'] / self.previous_customers * 100
+
+
+def _period_customers(customers):
+    """
+    (sorted unique User IDs, their revenue) per period of customer_aggregates().
+
+    The table is sorted by (Year, User ID), so each period is a contiguous run
+    of already sorted, unique IDs; no further sort or drop_duplicates is needed.
+    """
+    years = customers.index.get_level_values('Year')
+    ids = customers.index.get_level_values('User ID').to_numpy()
+    revenue = customers['revenue'].to_numpy()
+    bounds = np.searchsorted(years.codes, np.arange(len(years.categories) + 1))
+    return {period: (ids[start:stop], revenue[start:stop])
+            for period, start, stop in zip(years.categories, bounds[:-1], bounds[1:])}
+
+
+def compute_retention(df, customers=None):
+    """
+    Customers kept, lost and gained from each period to the next, with their revenue.
+
+    Works on the per-period ID arrays of customer_aggregates() (built from `df`
+    if omitted) with vectorized set membership, so the cost grows with the
+    number of customers, not orders, and no order rows are merged.
+    """
+    if customers is None:
+        customers = customer_aggregates(df)
+    runs = _period_customers(customers)
+    labels = list(runs)
+    counts, revenue, previous_periods = {}, {}, {}
+    for previous_period, period in zip(labels, labels[1:]):
+        previous, previous_revenue = runs[previous_period]
+        current, current_revenue = runs[period]
+        previous_periods[period] = previous_period
+        kept = np.isin(previous, current, assume_unique=True)
+        returning = np.isin(current, previous, assume_unique=True)
+        counts[period] = {
+            'retained': int(returning.sum()),
+            'churned': int((~kept).sum()),
+            'new': int((~returning).sum()),
+        }
+        revenue[period] = {
+            'retained': current_revenue[returning].sum(),
+            'churned': previous_revenue[~kept].sum(),
+            'new': current_revenue[~returning].sum(),
+        }
+    index = pd.Index(list(counts), name='Year')
+    return RetentionKPIs(
+        customers=pd.DataFrame(list(counts.values()), index=index, columns=['retained', 'churned', 'new']),
+        revenue=pd.DataFrame(list(revenue.values()), index=index, columns=['retained', 'churned', 'new']),
+        previous_period=pd.Series(list(previous_periods.values()), index=index),
+    )
+
+
+# ============================================================================
+# PART 3: MARKETING
+# ============================================================================
+
+@dataclass(frozen=True)
+class MarketingKPIs:
+    paid_revenue: pd.Series
+    paid_cost: pd.Series
+    roi: pd.Series                    # (Revenue - Cost) / Cost x 100, by Year
+    cpa_by_age: pd.DataFrame          # Mean Paid CPA, Age Range x Year
+    best_cpa_age: pd.Series           # Age Range with the lowest mean CPA, by Year
+    sales_by_channel: pd.DataFrame    # Customer Source x Year
+    channel_growth: pd.Series         # % growth per channel, previous to latest period
+
+
+def compute_marketing(df, periods=None):
+    """`periods` is the compare_periods() result; built from `df` if omitted"""
+    if periods is None:
+        periods = compare_periods(df)
+    cpa_by_age = _grouped(_paid(df), ['Year', 'Age Range'], 'CPA').mean().unstack(level=0)
+    cpa_by_age = cpa_by_age.reindex(AGE_ORDER)
+
+    sales_by_channel = _grouped(df, ['Year', 'Customer Source'], 'Order Amount').sum().unstack(level=0)
+
+    return MarketingKPIs(
+        paid_revenue=periods.metrics['paid_revenue'],
+        paid_cost=periods.metrics['ad_spend'],
+        roi=periods.metrics['roi'],
+        cpa_by_age=cpa_by_age,
+        best_cpa_age=cpa_by_age.idxmin(),
+        sales_by_channel=sales_by_channel,
+        channel_growth=_latest_growth(sales_by_channel),
+    )
+
+
+# ============================================================================
+# PART 4: SALES
+# ============================================================================
+
+@dataclass(frozen=True)
+class SalesKPIs:
+    revenue: pd.Series
+    avg_order: pd.Series
+    transactions: pd.Series
+    top_customer: pd.Series           # User ID with the highest spend, by Year
+    top_customer_amount: pd.Series
+    top_10_customers: pd.Series       # Total spend across all periods, best first
+
+    @property
+    def revenue_growth_pct(self):
+        return _pct_change(self.revenue)
+
+    @property
+    def avg_order_change_pct(self):
+        return _pct_change(self.avg_order)
+
+
+def compute_sales(df, periods=None, customers=None):
+    """
+    `periods` and `customers` are the compare_periods() and customer_aggregates()
+    results; each is built from `df` if omitted.
+    """
+    if customers is None:
+        customers = customer_aggregates(df)
+    if periods is None:
+        periods = compare_periods(df, customers)
+    spend_by_customer = customers['revenue']
+    top_index = spend_by_customer.groupby(level='Year', observed=True).idxmax()
+    return SalesKPIs(
+        revenue=periods.metrics['revenue'],
+        avg_order=periods.metrics['avg_order'],
+        transactions=periods.metrics['transactions'],
+        top_customer=pd.Series([uid for _, uid in top_index], index=top_index.index),
+        top_customer_amount=spend_by_customer.groupby(level='Year', observed=True).max(),
+        top_10_customers=spend_by_customer.groupby(level='User ID').sum().nlargest(10),
+    )
+
+
+# ============================================================================
+# PART 5: PRODUCT CATEGORIES
+# ============================================================================
+
+@dataclass(frozen=True)
+class ProductKPIs:
+    product_sales: pd.DataFrame           # Product Category x Year
+    product_transactions: pd.DataFrame    # Product Category x Year
+    most_popular_by_sales: pd.Series      # Category, by Year
+    most_popular_by_transactions: pd.Series
+    cpa_by_product: pd.DataFrame          # Mean Paid CPA, Product Category x Year
+    category_growth: pd.Series            # % growth per category, previous to latest period, best first
+
+
+def compute_products(df):
+    product_sales = _grouped(df, ['Year', 'Product Category'], 'Order Amount').sum().unstack(level=0)
+    product_transactions = _counts(df, ['Year', 'Product Category']).unstack(level=0)
+    cpa_by_product = _grouped(_paid(df), ['Year', 'Product Category'], 'CPA').mean().unstack(level=0)
+
+    return ProductKPIs(
+        product_sales=product_sales,
+        product_transactions=product_transactions,
+        most_popular_by_sales=product_sales.idxmax(),
+        most_popular_by_transactions=product_transactions.idxmax(),
+        cpa_by_product=cpa_by_product,
+        category_growth=_latest_growth(product_sales).sort_values(ascending=False, kind='stable'),
+    )
+
+
+# ============================================================================
+# ALL PARTS
+# ============================================================================
+
+@dataclass(frozen=True)
+class AnalysisKPIs:
+    objectives: ObjectivesKPIs
+    audience: AudienceKPIs
+    retention: RetentionKPIs
+    marketing: MarketingKPIs
+    sales: SalesKPIs
+    products: ProductKPIs
+
+    @property
+    def periods(self):
+        return self.objectives.total_sales.index.tolist()
+
+
+def compute_all(df):
+    """Compute Parts 1-5 from the combined frame"""
+    customers = customer_aggregates(df)
+    periods = compare_periods(df, customers)
+    return AnalysisKPIs(
+        objectives=compute_objectives(df, periods),
+        audience=compute_audience(df, periods),
+        retention=compute_retention(df, customers),
+        marketing=compute_marketing(df, periods),
+        sales=compute_sales(df, periods, customers),
+        products=compute_products(df),
+    )
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        # Period -> {row label -> value}, matching how the report reads the tables
+        return {str(column): _jsonable(value[column]) for column in value.columns}
+    if isinstance(value, pd.Series):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        # NaN and Infinity (e.g. growth from a zero base) are not valid JSON
+        return None
+    return value
+
+
+def kpis_to_dict(kpis):
+    """
+    Plain-Python form of an AnalysisKPIs for JSON output: every field and
+    derived property of each part, with period labels as string keys.
+    Undefined values (NaN, or infinite growth from a zero base) become None.
+    """
+    result = {}
+    for part in fields(kpis):
+        obj = getattr(kpis, part.name)
+        values = {field.name: getattr(obj, field.name) for field in fields(obj)}
+        values.update({name: getattr(obj, name) for name, attr in vars(type(obj)).items()
+                       if isinstance(attr, property)})
+        result[part.name] = {name: _jsonable(value) for name, value in values.items()}
+    return result
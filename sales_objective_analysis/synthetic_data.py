@@ -0,0 +1,146 @@
+"""
+Synthetic Data - Scalable Black Friday data for benchmarks
+Generates per-period frames with the workbook's columns, dtypes and category
+mix, from 10k rows up to tens of millions
+
+The profile is measured from a real combined frame (by default the sample
+workbook), so the synthetic data follows the same distributions:
+- customers keep one Age Range and Customer Source per period, drawn from that
+  period's customer mix, and place a number of orders drawn from the observed
+  orders-per-customer distribution
+- Product Category follows each period's order mix
+- Order Amount follows the observed quantiles; CPA is only set on Paid orders
+  and follows the observed Paid CPA quantiles, so totals, ad spend and ROI
+  match the sample in expectation
+- User IDs follow on from the previous period, with the observed share of
+  returning customers
+"""
+
+import numpy as np
+import pandas as pd
+
+from workbook_loader import BLACK_FRIDAY_SCHEMA
+
+QUANTILE_LEVELS = np.linspace(0, 1, 201)
+CUSTOMER_COLUMNS = ('Age Range', 'Customer Source')
+
+
+def _shares(values):
+    return values.value_counts(normalize=True, sort=False)
+
+
+def measure_profile(df):
+    """
+    Measure the distributions the generator needs from a combined frame (as
+    returned by kpi_engine.load_black_friday), per period.
+    """
+    profile = {}
+    previous_users = None
+    for period, frame in df.groupby('Year', observed=True):
+        customers = frame.drop_duplicates('User ID')
+        paid = frame[frame['Customer Source'] == 'Paid']
+        users = frame['User ID'].unique()
+        profile[period] = {
+            'row_share': len(frame) / len(df),
+            'customer_mix': {column: _shares(customers[column]) for column in CUSTOMER_COLUMNS},
+            'category_mix': _shares(frame['Product Category']),
+            'orders_per_customer': _shares(frame.groupby('User ID').size()),
+            'amount_quantiles': frame['Order Amount'].astype('float64').quantile(QUANTILE_LEVELS).to_numpy(),
+            'cpa_quantiles': paid['CPA'].astype('float64').quantile(QUANTILE_LEVELS).to_numpy(),
+            'returning_share': (np.isin(users, previous_users).mean() if previous_users is not None else 0.0),
+        }
+        previous_users = users
+    return profile
+
+
+def _choice(rng, shares, size):
+    """Sample `size` labels with the given probabilities, returned as integer codes"""
+    probabilities = shares.to_numpy(dtype='float64')
+    return rng.choice(len(probabilities), size=size, p=probabilities / probabilities.sum())
+
+
+def _from_quantiles(rng, quantiles, size):
+    """Inverse-CDF sampling between measured quantiles"""
+    return np.interp(rng.random(size), QUANTILE_LEVELS, quantiles)
+
+
+def _categorical(codes, categories, dtype):
+    if not isinstance(dtype, pd.CategoricalDtype):
+        dtype = pd.CategoricalDtype(sorted(categories))
+    remap = np.array([dtype.categories.get_loc(value) for value in categories], dtype=np.int8)
+    return pd.Categorical.from_codes(remap[codes], dtype=dtype)
+
+
+def _period_frame(rng, stats, n_rows, first_user_id, previous_users):
+    orders = stats['orders_per_customer']
+    # Enough customers to cover n_rows on average; the last one is trimmed to fit
+    n_customers = max(1, int(n_rows / np.average(orders.index, weights=orders.to_numpy()) * 1.1) + 1)
+    order_counts = orders.index.to_numpy()[_choice(rng, orders, n_customers)]
+    while order_counts.sum() < n_rows:
+        order_counts = np.concatenate([order_counts, order_counts])
+    n_customers = int(np.searchsorted(np.cumsum(order_counts), n_rows) + 1)
+    order_counts = order_counts[:n_customers]
+    order_counts[-1] -= order_counts.sum() - n_rows
+
+    user_ids = np.arange(first_user_id, first_user_id + n_customers, dtype=np.int64)
+    if previous_users is not None and stats['returning_share'] > 0:
+        returning = rng.random(n_customers) < stats['returning_share']
+        returning &= np.arange(n_customers) < len(previous_users)
+        user_ids[returning] = rng.choice(previous_users, size=int(returning.sum()), replace=False)
+
+    columns = {'User ID': np.repeat(user_ids, order_counts)}
+    for column in CUSTOMER_COLUMNS:
+        shares = stats['customer_mix'][column]
+        codes = np.repeat(_choice(rng, shares, n_customers), order_counts)
+        columns[column] = _categorical(codes, shares.index, BLACK_FRIDAY_SCHEMA[column])
+    shares = stats['category_mix']
+    columns['Product Category'] = _categorical(_choice(rng, shares, n_rows), shares.index,
+                                               BLACK_FRIDAY_SCHEMA['Product Category'])
+
+    amount = np.round(_from_quantiles(rng, stats['amount_quantiles'], n_rows), 2)
+    cpa = np.full(n_rows, np.nan)
+    paid = np.asarray(columns['Customer Source'] == 'Paid')
+    cpa[paid] = np.round(_from_quantiles(rng, stats['cpa_quantiles'], int(paid.sum())), 4)
+    columns['Order Amount'] = amount.astype(BLACK_FRIDAY_SCHEMA['Order Amount'])
+    columns['CPA'] = cpa.astype(BLACK_FRIDAY_SCHEMA['CPA'])
+
+    frame = pd.DataFrame({name: columns[name] for name in BLACK_FRIDAY_SCHEMA})
+    frame['User ID'] = pd.to_numeric(frame['User ID'], downcast='integer')
+    return frame, user_ids
+
+
+def generate(n_rows, profile, seed=0, first_user_id=1000001):
+    """
+    Generate about `n_rows` orders split across the profile's periods, as
+    {period: frame} in the loader's output schema, ready for
+    kpi_engine.combine_periods().
+    """
+    rng = np.random.default_rng(seed)
+    frames = {}
+    previous_users = None
+    next_user_id = first_user_id
+    for period, stats in profile.items():
+        rows = max(1, round(n_rows * stats['row_share']))
+        frames[period], users = _period_frame(rng, stats, rows, next_user_id, previous_users)
+        next_user_id = int(users.max()) + 1
+        previous_users = users
+    return frames
+
+
+def write_workbook(frames, path, sheets):
+    """
+    Write {period: frame} as an .xlsx with one sheet per period (named by
+    `sheets`), so the workbook loader can be benchmarked on synthetic data.
+    Sheets are limited to Excel's 1,048,575 data rows.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for period, frame in frames.items():
+        ws = wb.create_sheet(sheets[period])
+        ws.append(list(frame.columns))
+        columns = [frame[name].astype(object).where(frame[name].notna(), None).tolist()
+                   for name in frame.columns]
+        for row in zip(*columns):
+            ws.append(row)
+    wb.save(path)
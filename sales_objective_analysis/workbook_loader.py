@@ -0,0 +1,158 @@
+"""
+Workbook Loader - Single-pass streaming reader for the Black Friday workbook
+Opens the workbook once in openpyxl read-only mode and writes the declared
+columns straight into typed NumPy arrays
+"""
+
+import numpy as np
+import pandas as pd
+
+AGE_ORDER = ['18-25', '26-35', '36-45', '46-50', '51-55', '55+']
+
+# Columns the analysis uses, with the dtype each is stored as:
+#   'int'               smallest signed integer type that holds the sheet's values
+#   'float32'/'float64' NumPy floats; empty cells become NaN
+#   'category'          pandas Categorical, categories in sorted order
+#   CategoricalDtype    pandas Categorical with a fixed category order
+#   'str'               plain text column
+# Text and categorical columns are dictionary-encoded while streaming, so each
+# distinct value is held once no matter how many rows repeat it.
+BLACK_FRIDAY_SCHEMA = {
+    'User ID': 'int',
+    'Age Range': pd.CategoricalDtype(AGE_ORDER, ordered=True),
+    'Customer Source': 'category',
+    'Product Category': 'category',
+    'Order Amount': 'float32',
+    'CPA': 'float32',
+}
+
+_MIN_CAPACITY = 1024
+READER_VERSION = 2           # Bump when the rows read from a sheet change, to rebuild caches
+
+
+def _dtype_key(dtype):
+    # str(CategoricalDtype) is just 'category'; the categories and their order are part of the output
+    if isinstance(dtype, pd.CategoricalDtype):
+        return f'category(ordered={dtype.ordered}):{"|".join(map(str, dtype.categories))}'
+    return str(dtype)
+
+
+def schema_key(schema):
+    """Stable text form of a schema and the reader version, used to key caches of loader output"""
+    return f'v{READER_VERSION};' + ';'.join(f'{name}:{_dtype_key(dtype)}' for name, dtype in schema.items())
+
+
+def _is_encoded(dtype):
+    return isinstance(dtype, pd.CategoricalDtype) or dtype in ('str', 'category')
+
+
+def _decode(name, dtype, codes, lookup, sheet_name):
+    """Turn streamed codes plus the value -> code dict into the declared column type"""
+    seen = list(lookup)
+    if not isinstance(dtype, pd.CategoricalDtype):
+        if dtype == 'category':
+            dtype = pd.CategoricalDtype(sorted(seen))
+        else:
+            # Index the (tiny) value table with the codes; -1 picks the trailing NaN
+            values = np.empty(len(seen) + 1, dtype=object)
+            values[:-1] = seen
+            values[-1] = np.nan
+            return values[codes]
+    categories = list(dtype.categories)
+    unknown = [value for value in seen if value not in categories]
+    if unknown:
+        raise ValueError(f"Unexpected '{name}' values in sheet '{sheet_name}': {unknown}")
+
+    # Map first-seen codes to positions in the declared category order
+    remap = np.array([categories.index(value) for value in seen] + [-1], dtype=codes.dtype)
+    return pd.Categorical.from_codes(remap[codes], dtype=dtype)
+
+
+def _column_positions(header, schema, sheet_name):
+    header = [str(h).strip() if h is not None else None for h in header]
+    positions = {}
+    for name in schema:
+        if name not in header:
+            raise KeyError(f"Column '{name}' not found in sheet '{sheet_name}'")
+        positions[name] = header.index(name)
+    return positions
+
+
+def _read_sheet(ws, schema):
+    rows = ws.iter_rows(values_only=True)
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ValueError(f"Sheet '{ws.title}' is empty") from None
+    positions = _column_positions(header, schema, ws.title)
+
+    # The sheet's <dimension> tag gives the row count up front when present;
+    # otherwise the arrays grow by doubling and are trimmed at the end.
+    capacity = max((ws.max_row or 0) - 1, _MIN_CAPACITY)
+    numeric = []   # (name, position, array)
+    encoded = []   # (name, position, codes array, value -> code dict)
+    for name, dtype in schema.items():
+        if _is_encoded(dtype):
+            encoded.append((name, positions[name], np.empty(capacity, dtype=np.int32), {}))
+        else:
+            storage = 'int64' if dtype == 'int' else dtype
+            numeric.append((name, positions[name], np.empty(capacity, dtype=storage)))
+
+    # Read-only mode drops trailing empty cells, so short rows are padded
+    width = max(positions.values()) + 1
+    padding = (None,) * width
+
+    n = 0
+    for row in rows:
+        # Skip blank rows only; a row of zeros is data
+        if all(cell is None for cell in row):
+            continue
+        if len(row) < width:
+            row = row + padding[len(row):]
+        if n == capacity:
+            capacity *= 2
+            numeric = [(name, pos, np.resize(arr, capacity)) for name, pos, arr in numeric]
+            encoded = [(name, pos, np.resize(codes, capacity), lookup)
+                       for name, pos, codes, lookup in encoded]
+        for name, pos, arr in numeric:
+            value = row[pos]
+            if value is None:
+                if arr.dtype.kind != 'f':
+                    raise ValueError(f"Missing '{name}' in sheet '{ws.title}', data row {n + 1}")
+                value = np.nan
+            arr[n] = value
+        for name, pos, codes, lookup in encoded:
+            value = row[pos]
+            if value is None:
+                codes[n] = -1
+            else:
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                codes[n] = code
+        n += 1
+
+    columns = {}
+    for name, _, arr in numeric:
+        arr = arr[:n]
+        if schema[name] == 'int':
+            arr = pd.to_numeric(arr, downcast='integer')
+        columns[name] = arr
+    for name, _, codes, lookup in encoded:
+        columns[name] = _decode(name, schema[name], codes[:n], lookup, ws.title)
+    return pd.DataFrame({name: columns[name] for name in schema})
+
+
+def read_black_friday_sheets(path, sheet_names, schema=BLACK_FRIDAY_SCHEMA):
+    """
+    Read `sheet_names` from the workbook at `path` in a single open, returning
+    {sheet_name: DataFrame} restricted to the columns in `schema`.
+    """
+    # openpyxl is only needed on a cache miss; warm runs read Parquet instead
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return {name: _read_sheet(wb[name], schema) for name in sheet_names}
+    finally:
+        wb.close()
@@ -0,0 +1,132 @@
+"""
+Cohorts - Monthly acquisition cohorts of the ecommerce customers
+Groups customers by the month of their first purchase and tracks, for each
+cohort, how many were active and what they spent 0, 1, 2, ... months later
+
+Built from integer month codes: every customer's first month is a minimum
+over their lines, and each cohort x months-since-first matrix is a single 2D
+np.bincount over flattened cell indices; no pivot tables. Customers already
+active in the first month of the data all land in that month's cohort.
+
+Usage:
+    python cohorts.py                                   # retention table
+    python cohorts.py --heatmap cohort_retention.png    # plus a heatmap
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Entry script: put the repo root on sys.path so the project modules can import
+# the shared marketing_analytics package
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+from marketing_analytics import runtime  # noqa: E402
+from story_data import CSV_PATH, clean, customer_codes, load_data, months_from_codes  # noqa: E402
+
+
+@dataclass(frozen=True)
+class CohortMatrix:
+    customers: pd.DataFrame      # Active customers, Cohort (first-purchase month) x MonthsSinceFirst
+    revenue: pd.DataFrame        # Spend of the cohort's customers in the same cells
+    observed: np.ndarray         # False where the month lies past the end of the data
+
+    @property
+    def sizes(self):
+        """Customers acquired per cohort"""
+        return self.customers[0].rename('Customers')
+
+    @property
+    def retention(self):
+        """Share of each cohort active n months after its first; NaN past the end of the data"""
+        return self.customers.div(self.sizes, axis=0).where(self.observed)
+
+    @property
+    def revenue_per_customer(self):
+        """Cumulative spend per acquired customer, by months since first purchase"""
+        return self.revenue.cumsum(axis=1).div(self.sizes, axis=0).where(self.observed)
+
+
+def cohort_matrix(df):
+    """CohortMatrix of the customer lines (CustomerID present) of a cleaned frame"""
+    # Lines without an InvoiceDate have no month and belong to no cohort
+    lines = (df['CustomerID'].notna() & df['MonthCode'].notna()).to_numpy()
+    if not lines.any():
+        # No cohorts; month 0 is kept so sizes and retention still index
+        index = months_from_codes([]).rename('Cohort')
+        columns = pd.RangeIndex(1, name='MonthsSinceFirst')
+        return CohortMatrix(
+            customers=pd.DataFrame(np.zeros((0, 1), dtype=np.int64), index=index, columns=columns),
+            revenue=pd.DataFrame(np.zeros((0, 1)), index=index, columns=columns),
+            observed=np.zeros((0, 1), dtype=bool),
+        )
+    customer, ids = customer_codes(df['CustomerID'].to_numpy()[lines])
+    month = df['MonthCode'].to_numpy(dtype=np.int64, na_value=-1)[lines]
+    amounts = df['TotalAmount'].to_numpy()[lines]
+    first_code = month.min()
+    month -= first_code
+    n_months = int(month.max()) + 1
+    n_cells = n_months * n_months
+
+    # First-purchase month of every customer, broadcast back to their lines
+    first = np.full(len(ids), n_months, dtype=np.int64)
+    np.minimum.at(first, customer, month)
+    cohort = first[customer]
+    revenue = np.bincount(cohort * n_months + (month - cohort), weights=amounts, minlength=n_cells)
+
+    # A customer counts once per active month: distinct (customer, month) pairs
+    active_customer, active_month = np.divmod(pd.unique(customer * n_months + month), n_months)
+    active_cohort = first[active_customer]
+    customers = np.bincount(active_cohort * n_months + (active_month - active_cohort), minlength=n_cells)
+
+    customers = customers.reshape(n_months, n_months)
+    revenue = revenue.reshape(n_months, n_months)
+    cohorts = np.arange(n_months)
+    observed = cohorts[:, None] + cohorts[None, :] < n_months
+
+    # Months in which nobody bought for the first time have no cohort
+    keep = customers[:, 0] > 0
+    index = months_from_codes(cohorts[keep] + first_code).rename('Cohort')
+    columns = pd.RangeIndex(n_months, name='MonthsSinceFirst')
+    return CohortMatrix(
+        customers=pd.DataFrame(customers[keep], index=index, columns=columns),
+        revenue=pd.DataFrame(revenue[keep], index=index, columns=columns),
+        observed=observed[keep],
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Monthly acquisition cohorts of the ecommerce customers')
+    parser.add_argument('--data', default=CSV_PATH, help=f'ecommerce export (default: {CSV_PATH})')
+    parser.add_argument('--heatmap', metavar='PATH', help='save a retention heatmap to PATH')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    df = clean(load_data(args.data, columns=['InvoiceNo', 'Quantity', 'InvoiceDate',
+                                             'UnitPrice', 'CustomerID']))
+    matrix = cohort_matrix(df)
+
+    print("="*80)
+    print("MONTHLY COHORT RETENTION")
+    print("="*80)
+    print(f"\nCohorts: {len(matrix.customers)}, customers: {matrix.sizes.sum():,}")
+    print("\nShare of each cohort active n months after its first purchase:")
+    print(matrix.retention.to_string(float_format='{:.0%}'.format, na_rep=''))
+
+    if args.heatmap:
+        from story_charts import save_retention_heatmap
+
+        rendered = save_retention_heatmap(matrix.retention, args.heatmap)
+        print(f"\n✓ {'Saved' if rendered else 'Unchanged'}: {args.heatmap}")
+
+
+if __name__ == '__main__':
+    runtime.utf8_stdout()
+    main(sys.argv[1:])
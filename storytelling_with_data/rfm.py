@@ -0,0 +1,161 @@
+"""
+RFM - Recency, frequency and monetary segmentation of the ecommerce customers
+Scores every customer 1-5 on each dimension and names a segment from the
+recency and frequency scores, using grouped and NumPy operations only
+
+Works off a cleaned frame (story_data.clean); guest checkouts (no CustomerID)
+are left out. Recency is days from the last purchase to `as_of` (by default
+the day after the last invoice in the data), frequency is distinct invoices
+and monetary is total spend.
+
+Usage:
+    python rfm.py                        # segment summary for the sample CSV
+    python rfm.py --csv rfm.csv          # also write the per-customer table
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Entry script: put the repo root on sys.path so the project modules can import
+# the shared marketing_analytics package
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+from marketing_analytics import runtime  # noqa: E402
+from story_data import CSV_PATH, clean, customer_codes, load_data  # noqa: E402
+
+N_SCORES = 5
+
+# Segment by recency score (rows, 1-5) and frequency score (columns, 1-5)
+SEGMENTS = [
+    'Hibernating', 'At Risk', "Can't Lose Them", 'About to Sleep', 'Need Attention',
+    'Loyal Customers', 'Promising', 'Potential Loyalists', 'New Customers', 'Champions',
+]
+_SEGMENT_GRID = np.array([
+    # F:  1  2  3  4  5
+    [0, 0, 1, 1, 2],     # R = 1
+    [0, 0, 1, 1, 2],     # R = 2
+    [3, 3, 4, 5, 5],     # R = 3
+    [6, 7, 7, 5, 5],     # R = 4
+    [8, 7, 7, 9, 9],     # R = 5
+], dtype=np.int8)
+
+
+def _invoice_codes(invoice):
+    if isinstance(invoice.dtype, pd.CategoricalDtype):
+        return invoice.cat.codes.to_numpy(), len(invoice.cat.categories)
+    codes, uniques = pd.factorize(invoice)
+    return codes, len(uniques)
+
+
+def customer_metrics(df, as_of=None):
+    """
+    Recency (days), Frequency (invoices) and Monetary (spend) per CustomerID
+    of a cleaned frame. Every metric is a NumPy reduction over one shared
+    array of customer codes (bincount, maximum.at), so the lines are grouped
+    once rather than once per metric.
+    """
+    # Lines without an InvoiceDate can't date a purchase, so they count toward no metric
+    lines = (df['CustomerID'].notna() & df['InvoiceDate'].notna()).to_numpy()
+    if not lines.any():
+        return pd.DataFrame({'Recency': [], 'Frequency': [], 'Monetary': []},
+                            index=pd.Index([], dtype=np.int64, name='CustomerID'))
+    customer, ids = customer_codes(df['CustomerID'].to_numpy()[lines])
+    invoice, n_invoices = _invoice_codes(df['InvoiceNo'])
+    invoice = invoice[lines]
+    dates = df['InvoiceDate'].to_numpy()[lines]
+    amounts = df['TotalAmount'].to_numpy()[lines]
+    n_codes = len(ids)
+
+    present = np.bincount(customer, minlength=n_codes) > 0
+    monetary = np.bincount(customer, weights=amounts, minlength=n_codes)
+    last = np.full(n_codes, np.iinfo(np.int64).min)
+    np.maximum.at(last, customer, dates.view(np.int64))
+    # Distinct invoices: distinct (customer, invoice) pairs, counted per customer
+    pairs = pd.unique(customer.astype(np.int64) * n_invoices + invoice)
+    frequency = np.bincount(pairs // n_invoices, minlength=n_codes)
+
+    last = last[present].view(dates.dtype)
+    if as_of is None:
+        as_of = pd.Timestamp(last.max()).normalize() + pd.Timedelta(days=1)
+    recency = (np.datetime64(pd.Timestamp(as_of)) - last) // np.timedelta64(1, 'D')
+    return pd.DataFrame({
+        'Recency': recency.astype(np.int32),
+        'Frequency': frequency[present].astype(np.int32),
+        'Monetary': monetary[present],
+    }, index=pd.Index(np.asarray(ids)[present].astype(np.int64), name='CustomerID'))
+
+
+def quantile_scores(values, n=N_SCORES, higher_is_better=True):
+    """
+    Scores 1..n by quantile of `values`. Ties are broken by position so every
+    score gets an equal share of customers, even where most customers share a
+    value (e.g. one invoice each).
+    """
+    ranks = pd.Series(values).rank(method='first', pct=True).to_numpy()
+    scores = np.ceil(ranks * n).astype(np.int8)
+    return scores if higher_is_better else (n + 1 - scores).astype(np.int8)
+
+
+def rfm_table(df, as_of=None):
+    """
+    Per-customer table indexed by CustomerID: Recency, Frequency, Monetary,
+    their scores R, F, M (5 is best) and the Segment named by R and F
+    """
+    rfm = customer_metrics(df, as_of)
+    rfm['R'] = quantile_scores(rfm['Recency'].to_numpy(), higher_is_better=False)
+    rfm['F'] = quantile_scores(rfm['Frequency'].to_numpy())
+    rfm['M'] = quantile_scores(rfm['Monetary'].to_numpy())
+    codes = _SEGMENT_GRID[rfm['R'].to_numpy() - 1, rfm['F'].to_numpy() - 1]
+    rfm['Segment'] = pd.Categorical.from_codes(codes, categories=SEGMENTS)
+    return rfm
+
+
+def segment_summary(rfm):
+    """Customers, mean recency/frequency/spend and share of revenue per segment, largest first"""
+    summary = rfm.groupby('Segment', observed=True).agg(
+        Customers=('Recency', 'size'),
+        Recency=('Recency', 'mean'),
+        Frequency=('Frequency', 'mean'),
+        Monetary=('Monetary', 'mean'),
+        Revenue=('Monetary', 'sum'),
+    )
+    summary['CustomerShare'] = summary['Customers'] / summary['Customers'].sum()
+    summary['RevenueShare'] = summary['Revenue'] / summary['Revenue'].sum()
+    return summary.sort_values('Customers', ascending=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='RFM segmentation of the ecommerce customers')
+    parser.add_argument('--data', default=CSV_PATH, help=f'ecommerce export (default: {CSV_PATH})')
+    parser.add_argument('--as-of', help='date recency is measured to (default: day after the last invoice)')
+    parser.add_argument('--csv', dest='csv_path', metavar='PATH', help='write the per-customer table as CSV')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    df = clean(load_data(args.data, columns=['InvoiceNo', 'Quantity', 'InvoiceDate',
+                                             'UnitPrice', 'CustomerID']))
+    rfm = rfm_table(df, args.as_of)
+
+    print("="*80)
+    print("RFM CUSTOMER SEGMENTS")
+    print("="*80)
+    print(f"\nCustomers: {len(rfm):,} (guest checkouts excluded)")
+    with pd.option_context('display.float_format', '{:,.2f}'.format, 'display.width', 120,
+                           'display.max_columns', None):
+        print(segment_summary(rfm))
+
+    if args.csv_path:
+        rfm.to_csv(args.csv_path)
+        print(f"\nCustomer table written to {args.csv_path}")
+
+
+if __name__ == '__main__':
+    runtime.utf8_stdout()
+    main(sys.argv[1:])
@@ -0,0 +1,111 @@
+"""
+Story Cache - Frames derived from the ecommerce CSV, kept on disk as Parquet
+Each CSV gets its own directory under .story_cache/ next to it, named after
+the file. Its entries are tied to the CSV's resolved path, size and mtime and
+dropped when that CSV changes; other CSVs in the folder keep theirs.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from marketing_analytics.disk_cache import (
+    MANIFEST_NAME,
+    file_state,
+    parquet_available,
+    pyarrow_available,
+    read_manifest,
+    write_json,
+)
+
+CACHE_DIR_NAME = '.story_cache'
+CACHE_VERSION = 2
+
+
+def cache_dir(path):
+    path = Path(path).resolve()
+    return path.parent / CACHE_DIR_NAME / path.name
+
+
+def _source(path):
+    """The stamp entries are recorded against: which file, and which version of it"""
+    return {'path': str(Path(path).resolve()), **file_state(path)}
+
+
+def entry_file(path, name, key=None):
+    """The Parquet file stored as `name` for the CSV at `path`, or None if missing or stale"""
+    if not parquet_available():
+        return None
+    directory = cache_dir(path)
+    manifest = read_manifest(directory / MANIFEST_NAME, CACHE_VERSION)
+    if not manifest or manifest.get('source') != _source(path):
+        return None
+    entry = manifest['entries'].get(name)
+    if not entry or entry.get('key') != key or not (directory / entry['file']).exists():
+        return None
+    return directory / entry['file']
+
+
+def load(path, name, key=None, columns=None):
+    """
+    The frame stored as `name` for the CSV at `path`, or None if missing or
+    stale. Only `columns` are read if given; with pyarrow the file is
+    memory-mapped rather than read into a buffer first.
+    """
+    file = entry_file(path, name, key)
+    if file is None:
+        return None
+    options = {'memory_map': True} if pyarrow_available() else {}
+    return pd.read_parquet(file, columns=columns, **options)
+
+
+@contextmanager
+def storing(path, name, key=None):
+    """
+    Write the entry `name` for the CSV at `path` in a with-block: yields a
+    temporary file for the block to write the Parquet data to, e.g. one row
+    group at a time. The entry is recorded only if the block completes;
+    otherwise the file is removed. Entries recorded against an older version
+    of the same CSV are removed.
+    """
+    directory = cache_dir(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Stamped before writing, so a CSV changed meanwhile leaves the entry stale
+    state = _source(path)
+    target = directory / f'{name}.parquet'
+    tmp = target.with_name(target.name + '.tmp')
+    try:
+        yield tmp
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, target)
+
+    manifest = read_manifest(directory / MANIFEST_NAME, CACHE_VERSION)
+    if not manifest or manifest.get('source') != state:
+        manifest = {'version': CACHE_VERSION, 'source': state, 'entries': {}}
+    manifest['entries'][name] = {'key': key, 'file': target.name}
+
+    for stale in directory.glob('*.parquet'):
+        if stale.name not in {entry['file'] for entry in manifest['entries'].values()}:
+            stale.unlink()
+    write_json(directory / MANIFEST_NAME, manifest)
+
+    # Version 1 kept a single CSV's entries directly in .story_cache/; nothing reads them now
+    for leftover in [*directory.parent.glob('*.parquet'), directory.parent / MANIFEST_NAME]:
+        leftover.unlink(missing_ok=True)
+
+
+def store(path, name, frame, key=None, index=None):
+    """
+    Save `frame` as `name` for the CSV at `path` (see storing()). `index` is
+    passed to to_parquet. Returns the Parquet file, or None when Parquet is
+    unavailable.
+    """
+    if not parquet_available():
+        return None
+    with storing(path, name, key) as file:
+        frame.to_parquet(file, index=index)
+    return cache_dir(path) / f'{name}.parquet'
@@ -0,0 +1,201 @@
+"""
+Story Charts - The monthly sales chart behind the story visuals, and the
+cohort retention heatmap
+Draws the bar chart once and saves one variant per highlighted month by
+recoloring the bars, optionally collecting the variants into an animated GIF
+or a multi-page PDF
+
+Only the face colors differ between variants, so N highlighted PNGs cost one
+full draw plus N saves. Each PNG is skipped if its inputs are unchanged since it
+was last written (see marketing_analytics/figure_cache.py); when every PNG is
+fresh and no GIF or PDF is requested, the chart is not drawn at all.
+"""
+
+import io
+
+import matplotlib
+matplotlib.use('Agg')  # the visuals are only ever saved to file
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.colors import LinearSegmentedColormap
+
+from marketing_analytics import instrumentation, theme
+from marketing_analytics.figure_cache import figure_key, is_fresh, record, source_digest
+
+# Color scheme
+COLOR_BASE = theme.TEAL
+COLOR_HIGHLIGHT = '#663399'  # Dark purple (complementary)
+
+DPI = theme.DPI
+GIF_DPI = 80                 # Full-resolution frames would make a ~4000px wide GIF
+GIF_FRAME_MS = 1500
+
+plt.rcParams['figure.figsize'] = (14, 7)
+plt.rcParams['font.size'] = 11
+
+# Anything besides the monthly totals that changes how the charts look; a chart
+# is redrawn only when its key changes
+STYLE_KEY = (COLOR_BASE, COLOR_HIGHLIGHT, DPI, matplotlib.__version__, source_digest(__file__))
+
+
+class MonthHighlightChart:
+    """Bar chart of monthly sales, drawn once; highlight() recolors it for one month"""
+
+    def __init__(self, monthly_data):
+        self.months = list(monthly_data['MonthDate'])
+        self.fig, ax = plt.subplots(figsize=(14, 7))
+
+        self.bars = ax.bar(monthly_data['MonthName'], monthly_data['TotalAmount'],
+                           color=COLOR_BASE, edgecolor='black', linewidth=1)
+
+        ax.set_ylabel('Total Sales (£)', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Month', fontsize=14, fontweight='bold')
+        ax.set_title('When Do Gift Shoppers Buy?', fontsize=18, fontweight='bold', pad=20)
+        ax.tick_params(axis='x', rotation=45)
+
+        # Add value labels on bars
+        for bar in self.bars:
+            height = bar.get_height()
+            if height > 0:
+                ax.text(bar.get_x() + bar.get_width()/2., height,
+                        f'£{height/1000:.0f}K',
+                        ha='center', va='bottom', fontsize=9, fontweight='bold')
+
+        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'£{x/1000:.0f}K'))
+        ax.grid(True, alpha=0.3, axis='y')
+
+        self.fig.tight_layout()
+        self._bboxes = {}
+
+    def highlight(self, month):
+        """Color only `month`'s bar with the highlight color"""
+        for bar, date in zip(self.bars, self.months):
+            bar.set_facecolor(COLOR_HIGHLIGHT if date == month else COLOR_BASE)
+
+    def _tight_bbox(self, dpi):
+        # Recoloring never moves anything, so the tight bounding box is measured
+        # once per dpi instead of by an extra draw in every savefig
+        if dpi not in self._bboxes:
+            original = self.fig.dpi
+            self.fig.dpi = dpi
+            try:
+                bbox = self.fig.get_tightbbox(self.fig.canvas.get_renderer())
+            finally:
+                self.fig.dpi = original
+            self._bboxes[dpi] = bbox.padded(plt.rcParams['savefig.pad_inches'])
+        return self._bboxes[dpi]
+
+    def save(self, target, dpi=DPI, **kwargs):
+        self.fig.savefig(target, dpi=dpi, bbox_inches=self._tight_bbox(dpi), **kwargs)
+
+    def close(self):
+        plt.close(self.fig)
+
+
+def highlight_key(monthly_data, month):
+    return figure_key(monthly_data[['MonthDate', 'MonthName', 'TotalAmount']], month, STYLE_KEY)
+
+
+def _write_gif(frames, path):
+    from PIL import Image  # Pillow ships with matplotlib
+
+    images = [Image.open(frame).convert('RGB') for frame in frames]
+    images[0].save(path, save_all=True, append_images=images[1:],
+                   duration=GIF_FRAME_MS, loop=0)
+
+
+def render_highlights(monthly_data, months, paths, gif_path=None, pdf_path=None, use_cache=True):
+    """
+    Save the chart once per month in `months`, with that month highlighted, to
+    the matching entry of `paths`. Yields (path, rendered) in order; rendered is
+    False for a PNG left as is because its inputs are unchanged.
+
+    `gif_path` and `pdf_path` add an animated GIF (one frame per month) and a
+    multi-page PDF (one page per month) of the same sequence; both are always
+    written when requested.
+    """
+    keys = [highlight_key(monthly_data, month) for month in months]
+    stale = [not (use_cache and is_fresh(path, key)) for path, key in zip(paths, keys)]
+    if not any(stale) and not gif_path and not pdf_path:
+        for path in paths:
+            yield path, False
+        return
+
+    with instrumentation.span('draw monthly chart'):
+        chart = MonthHighlightChart(monthly_data)
+    pdf = PdfPages(pdf_path) if pdf_path else None
+    frames = []
+    try:
+        for month, path, key, redraw in zip(months, paths, keys, stale):
+            chart.highlight(month)
+            if redraw:
+                with instrumentation.span(f'savefig {path}'):
+                    chart.save(path)
+                record(path, key)
+            if pdf is not None:
+                with instrumentation.span(f'savefig {pdf_path} page'):
+                    chart.save(pdf, format='pdf')
+            if gif_path:
+                frame = io.BytesIO()
+                chart.save(frame, dpi=GIF_DPI, format='png')
+                frames.append(frame)
+            yield path, redraw
+    finally:
+        if pdf is not None:
+            pdf.close()
+        chart.close()
+
+    if gif_path:
+        with instrumentation.span(f'write {gif_path}'):
+            _write_gif(frames, gif_path)
+
+
+# ================================================================================
+# COHORT RETENTION HEATMAP
+# ================================================================================
+
+RETENTION_CMAP = LinearSegmentedColormap.from_list('retention', ['#FFFFFF', COLOR_BASE])
+
+
+def plot_retention_heatmap(retention, path):
+    """
+    Cohort x months-since-first heatmap of `retention` (cohorts.CohortMatrix.retention).
+    Month 0 is always 100%, so the color scale runs to the highest later value.
+    """
+    values = retention.to_numpy(dtype=float)
+    later = values[:, 1:]
+    vmax = np.nanmax(later) if np.isfinite(later).any() else 1.0
+
+    fig, ax = plt.subplots(figsize=(14, 8))
+    image = ax.imshow(np.ma.masked_invalid(values), cmap=RETENTION_CMAP, vmin=0, vmax=vmax, aspect='auto')
+
+    for (row, col), value in np.ndenumerate(values):
+        if np.isfinite(value):
+            ax.text(col, row, f'{value:.0%}', ha='center', va='center', fontsize=8,
+                    color='white' if value > vmax * 0.6 else '#333')
+
+    ax.set_xticks(range(values.shape[1]))
+    ax.set_yticks(range(values.shape[0]))
+    ax.set_yticklabels([cohort.strftime('%b %Y') for cohort in retention.index])
+    ax.set_xlabel('Months Since First Purchase', fontsize=14, fontweight='bold')
+    ax.set_ylabel('First-Purchase Month', fontsize=14, fontweight='bold')
+    ax.set_title('How Many Customers Come Back?', fontsize=18, fontweight='bold', pad=20)
+    colorbar = fig.colorbar(image, ax=ax, format=plt.FuncFormatter(lambda x, p: f'{x:.0%}'))
+    colorbar.set_label('Share of cohort active')
+
+    fig.tight_layout()
+    with instrumentation.span(f'savefig {path}'):
+        fig.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close(fig)
+
+
+def save_retention_heatmap(retention, path):
+    """Draw the heatmap unless its inputs are unchanged since `path` was written; True if drawn"""
+    key = figure_key(retention, STYLE_KEY)
+    if is_fresh(path, key):
+        return False
+    with instrumentation.span(f'render {path}'):
+        plot_retention_heatmap(retention, path)
+    record(path, key)
+    return True
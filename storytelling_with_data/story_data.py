@@ -0,0 +1,506 @@
+"""
+Story Data - Loading, cleaning and aggregation behind storytelling_analysis.py
+Works on the whole CSV in memory, or streams it in chunks and folds each
+cleaned chunk into running totals. Either way the rows come from a typed
+Parquet working copy of the CSV when one is fresh. Monthly figures come from a month x country
+rollup cube, which is kept on disk so later runs and per-country variants
+slice it instead of rescanning the raw rows.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import story_cache
+
+from marketing_analytics.disk_cache import pyarrow_available
+from marketing_analytics.figure_cache import source_digest
+
+CSV_PATH = 'Ecommerce Dataset - data.csv'
+DEFAULT_CHUNKSIZE = 500_000
+
+# Only the columns the story (and the customer analyses) use, with explicit dtypes
+# so pandas does not have to infer them; StockCode is never read
+CSV_DTYPES = {
+    'InvoiceNo': 'str',
+    'Description': 'str',
+    'Quantity': 'int64',
+    'InvoiceDate': 'str',
+    'UnitPrice': 'float64',
+    'CustomerID': 'float64',     # Blank for guest checkouts
+    'Country': 'category',
+}
+INVOICE_DATE_FORMAT = '%m/%d/%Y %H:%M'     # e.g. 12/1/2010 8:26
+CUBE_KEYS = ['MonthCode', 'Country']
+
+
+def read_csv(path=CSV_PATH, **kwargs):
+    """pd.read_csv restricted to CSV_DTYPES' columns and types"""
+    return pd.read_csv(path, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES, **kwargs)
+
+
+# ================================================================================
+# PARQUET WORKING COPY
+# ================================================================================
+
+# The CSV's columns with InvoiceDate stored as timestamps and the text columns as
+# dictionary-encoded categoricals, kept in .story_cache/<CSV name>/ next to the CSV. It is
+# written chunk by chunk, one row group per chunk, by whichever run first reads
+# the CSV, and rebuilt when the CSV changes, or when this key (its layout) does.
+WORKING_COPY = 'data'
+WORKING_COPY_KEY = [2, {column: str(dtype) for column, dtype in CSV_DTYPES.items()}, INVOICE_DATE_FORMAT]
+
+
+def to_working_copy(df):
+    """A read_csv() frame with InvoiceDate parsed and InvoiceNo/Description as categoricals"""
+    return df.assign(
+        InvoiceNo=df['InvoiceNo'].astype('category'),
+        Description=df['Description'].astype('category'),
+        InvoiceDate=parse_invoice_dates(df['InvoiceDate']),
+    )
+
+
+def load_data(path=CSV_PATH, columns=None):
+    """
+    The CSV's rows (only `columns`, if given), read from the Parquet working
+    copy. If it is missing or stale it is first converted from the CSV in
+    chunks, so the raw text of the whole file is never held. Without pyarrow
+    the whole CSV is read and converted (and saved if fastparquet is there).
+    """
+    frame = story_cache.load(path, WORKING_COPY, key=WORKING_COPY_KEY, columns=columns)
+    if frame is None and pyarrow_available():
+        for _ in _converted_chunks(path, DEFAULT_CHUNKSIZE):
+            pass
+        frame = story_cache.load(path, WORKING_COPY, key=WORKING_COPY_KEY, columns=columns)
+    if frame is not None:
+        return _sorted_categories(frame)
+
+    frame = to_working_copy(read_csv(path))
+    story_cache.store(path, WORKING_COPY, frame, key=WORKING_COPY_KEY, index=False)
+    return frame if columns is None else frame[columns]
+
+
+def _sorted_categories(frame):
+    # Row groups written from different chunks have their own dictionaries, which
+    # are merged in first-seen order on read; sorted categories keep groupings
+    # (and so ties in the top-k lists) in the same order as a single-chunk copy
+    for column in frame.select_dtypes('category'):
+        categories = frame[column].cat.categories
+        if not categories.is_monotonic_increasing:
+            frame[column] = frame[column].cat.reorder_categories(categories.sort_values())
+    return frame
+
+
+def _working_copy_schema(schema):
+    # Each chunk has its own categories, so its dictionary indices may be int8 or
+    # int16; every row group is written with int32 indices, which fit any chunk
+    import pyarrow as pa
+
+    return pa.schema([pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+                      if pa.types.is_dictionary(field.type) else field for field in schema],
+                     metadata=schema.metadata)
+
+
+def _converted_chunks(path, chunksize):
+    """
+    Yield the CSV in `chunksize`-row frames converted by to_working_copy(),
+    appending each to the working copy as a row group. The working copy is
+    recorded once the last chunk has been yielded; a run stopped part-way
+    leaves no entry.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with story_cache.storing(path, WORKING_COPY, key=WORKING_COPY_KEY) as file:
+        writer = None
+        try:
+            for chunk in read_csv(path, chunksize=chunksize):
+                chunk = to_working_copy(chunk)
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    schema = _working_copy_schema(table.schema)
+                    writer = pq.ParquetWriter(file, schema)
+                writer.write_table(table.cast(schema))
+                yield chunk
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def _raw_chunks(path, chunksize):
+    """
+    `chunksize`-row frames of the working copy if it is fresh. Otherwise the
+    CSV's, converted and saved as the working copy along the way (plain CSV
+    chunks without pyarrow).
+    """
+    if not pyarrow_available():
+        yield from read_csv(path, chunksize=chunksize)
+        return
+    file = story_cache.entry_file(path, WORKING_COPY, key=WORKING_COPY_KEY)
+    if file is None:
+        yield from _converted_chunks(path, chunksize)
+        return
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(file, memory_map=True).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def parse_invoice_dates(values):
+    """
+    Parse InvoiceDate text to datetime64. Timestamps repeat heavily (one per
+    invoice, not per line), so each distinct string is parsed once with the
+    fixed format and the result is broadcast back by code. Falls back to
+    format inference for exports in another layout. Missing dates stay NaT.
+    """
+    codes, uniques = pd.factorize(values)
+    try:
+        parsed = pd.to_datetime(uniques, format=INVOICE_DATE_FORMAT)
+    except ValueError:
+        parsed = pd.to_datetime(uniques)
+    # factorize codes a missing value as -1, which fills in NaT here
+    parsed = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(parsed, index=values.index, name=values.name)
+
+
+def month_codes(dates):
+    """
+    Integer month keys: pandas' monthly Period ordinals (months since 1970-01).
+    A missing date has no month: if there are any, the codes are a nullable
+    Int32 array with <NA> there, which groupings drop as they drop NaT Periods.
+    """
+    values = dates.to_numpy()
+    codes = values.astype('datetime64[M]').astype(np.int32)
+    missing = np.isnat(values)
+    if missing.any():
+        return pd.arrays.IntegerArray(codes, missing)
+    return codes
+
+
+def months_from_codes(codes):
+    return pd.PeriodIndex.from_ordinals(np.asarray(codes, dtype=np.int64), freq='M')
+
+
+def _cancelled(invoice):
+    """Boolean array: InvoiceNo starts with 'C'"""
+    if isinstance(invoice.dtype, pd.CategoricalDtype):
+        # Test each distinct invoice number once; the appended False is what
+        # code -1 (a missing InvoiceNo) picks up
+        flags = np.asarray(invoice.cat.categories.str.startswith('C'), dtype=bool)
+        return np.append(flags, False)[invoice.cat.codes.to_numpy()]
+    if not pd.api.types.is_string_dtype(invoice):
+        invoice = invoice.astype('str')
+    return invoice.str.startswith('C').to_numpy(dtype=bool)
+
+
+def clean(df):
+    """
+    Drop cancelled orders and non-positive lines, then add TotalAmount and MonthCode.
+
+    All three filters are combined into one boolean mask, so the cleaned frame
+    is materialized once, with TotalAmount computed from the same selection.
+    """
+    quantity = df['Quantity'].to_numpy()
+    price = df['UnitPrice'].to_numpy()
+
+    # Cancelled orders have an InvoiceNo starting with 'C'; returns and
+    # adjustments have non-positive quantities or prices
+    keep = (quantity > 0) & (price > 0)
+    keep &= ~_cancelled(df['InvoiceNo'])
+    df = df[keep].assign(TotalAmount=quantity[keep] * price[keep])
+
+    # Parse dates (the working copy already has them); months are grouped by
+    # integer code and only turned into Periods (and names) once per month,
+    # after aggregation
+    if not pd.api.types.is_datetime64_any_dtype(df['InvoiceDate']):
+        df['InvoiceDate'] = parse_invoice_dates(df['InvoiceDate'])
+    df['MonthCode'] = month_codes(df['InvoiceDate'])
+    return df
+
+
+def customer_codes(ids):
+    """
+    (codes, CustomerID per code) for non-missing customer IDs, so that
+    per-customer metrics can be NumPy reductions over the codes. IDs are
+    usually a dense run of integers, so the offset from the smallest ID is the
+    code, with no hashing; sparse or non-integer IDs are factorized instead.
+    Dense codes can include IDs with no lines, which callers drop.
+    """
+    if np.array_equal(ids, np.floor(ids)):
+        ids = ids.astype(np.int64)
+        low, high = ids.min(), ids.max()
+        if high - low < 4 * len(ids):
+            return ids - low, np.arange(low, high + 1)
+    return pd.factorize(ids, sort=True)
+
+
+@dataclass(frozen=True)
+class StoryAggregates:
+    cube: pd.DataFrame               # Month x country rollup; see build_cube
+    monthly_sales: pd.DataFrame      # Month, TotalAmount, MonthDate; one row per month in order
+    products: pd.DataFrame           # Per-Description metrics, unsorted; see product_metrics
+
+    def top_products(self, metric, k=10):
+        """The k best products by `metric`, best first"""
+        return top_k(self.products, metric, k)
+
+
+@dataclass(frozen=True)
+class StreamSummary:
+    rows: int                        # Raw rows read
+    columns: int
+    rows_kept: int                   # Rows left after cleaning
+    first_date: str                  # Min / max InvoiceDate of the raw rows, as str(Timestamp);
+    last_date: str                   # None when no row has a date
+
+
+# Nothing read yet, e.g. a header-only export
+EMPTY_SUMMARY = StreamSummary(rows=0, columns=len(CSV_DTYPES), rows_kept=0, first_date=None, last_date=None)
+
+
+def build_cube(df):
+    """
+    Month x country rollup of a cleaned frame, in one grouped pass: TotalAmount,
+    Quantity, Invoices (distinct InvoiceNo) and Customers (distinct CustomerID,
+    guest checkouts excluded), indexed by (MonthCode, Country)
+    """
+    cube = df.groupby(CUBE_KEYS, observed=True).agg(
+        TotalAmount=('TotalAmount', 'sum'),
+        Quantity=('Quantity', 'sum'),
+        Invoices=('InvoiceNo', 'nunique'),
+        Customers=('CustomerID', 'nunique'),
+    )
+    # Countries are plain strings in the cube: every CSV chunk gets its own
+    # categories, so categorical levels would not line up across chunks
+    cube.index = cube.index.set_levels(cube.index.levels[1].astype(str), level='Country')
+    return cube.sort_index()
+
+
+def monthly_sales(cube, country=None):
+    """Month, TotalAmount, MonthDate per month, for every country or just `country`"""
+    if country is not None:
+        cube = cube.xs(country, level='Country', drop_level=False)
+    monthly = cube.groupby(level='MonthCode')['TotalAmount'].sum()
+    monthly.index = months_from_codes(monthly.index).rename('Month')
+    frame = monthly.reset_index()
+    frame['MonthDate'] = frame['Month'].dt.to_timestamp()
+    return frame
+
+
+def product_totals(df):
+    """TotalAmount and Quantity by Description: the product metrics that fold across chunks"""
+    return df.groupby('Description', observed=True)[['TotalAmount', 'Quantity']].sum()
+
+
+def product_metrics(df):
+    """
+    Per-Description TotalAmount, Quantity, Invoices (distinct InvoiceNo) and
+    Buyers (distinct CustomerID) of a cleaned frame, in one grouped pass
+    """
+    return df.groupby('Description', observed=True).agg(
+        TotalAmount=('TotalAmount', 'sum'),
+        Quantity=('Quantity', 'sum'),
+        Invoices=('InvoiceNo', 'nunique'),
+        Buyers=('CustomerID', 'nunique'),
+    )
+
+
+def top_k(frame, metric, k=10):
+    """
+    The k largest values of `frame[metric]`, best first; ties keep index order.
+    A partial selection (np.partition) plus a sort of the k winners costs
+    O(n + k log k), where a full sort of every product costs O(n log n).
+    """
+    column = frame[metric]
+    values = column.to_numpy()
+    k = min(k, len(values))
+    if k == 0:
+        return column.iloc[:0]
+    if k < len(values):
+        # Everything at or above the k-th largest value, so ties at the cut are
+        # resolved by index order below rather than by argpartition
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort((candidates, -values[candidates]))[:k]
+    return column.iloc[candidates[order]]
+
+
+def from_totals(cube, products):
+    """StoryAggregates from a cube and per-Description metrics"""
+    return StoryAggregates(cube=cube, monthly_sales=monthly_sales(cube), products=products)
+
+
+def aggregate(df):
+    """Month x country cube, monthly and per-product metrics from a cleaned frame"""
+    return from_totals(build_cube(df), product_metrics(df))
+
+
+def empty_totals():
+    """
+    (cube sums, product totals) of no rows, typed as cube_sums() and
+    product_totals() return them: the starting point of the running totals
+    """
+    columns = {'TotalAmount': pd.Series(dtype=np.float64), 'Quantity': pd.Series(dtype=np.int64)}
+    cube_index = pd.MultiIndex.from_arrays(
+        [np.array([], dtype=np.int32), pd.Index([], dtype='str')], names=CUBE_KEYS)
+    return (pd.DataFrame(columns, index=cube_index),
+            pd.DataFrame(columns, index=pd.Index([], dtype='str', name='Description')))
+
+
+def fold_totals(running, partial):
+    """Merge one chunk's partial sums into the running totals (index-aligned)"""
+    if running is None or running.empty:
+        return partial
+    combined = pd.concat([running, partial])
+    return combined.groupby(level=list(range(combined.index.nlevels))).sum()
+
+
+class DistinctCounter:
+    """
+    Running count of distinct ids per cube key. Every (month, country, id)
+    seen is kept in a set, so each chunk is checked against it in time
+    proportional to the chunk, and only the pairs it adds are counted.
+    """
+
+    def __init__(self):
+        self.seen = set()
+        self.counts = Counter()
+
+    def add(self, rows):
+        """Count the (MonthCode, Country, Id) rows of one chunk that were not seen before"""
+        new = set(rows.itertuples(index=False, name=None)) - self.seen
+        self.seen |= new
+        self.counts.update(row[:2] for row in new)
+
+    def series(self):
+        """Distinct ids per (MonthCode, Country)"""
+        index = pd.MultiIndex.from_tuples(list(self.counts), names=CUBE_KEYS)
+        return pd.Series(list(self.counts.values()), index=index, dtype=np.int64)
+
+
+def _cube_keys(df):
+    return df[CUBE_KEYS].assign(Country=df['Country'].astype(str))
+
+
+def cube_sums(df):
+    """The cube's additive columns (TotalAmount, Quantity) for a cleaned chunk"""
+    keys = _cube_keys(df)
+    return keys.assign(TotalAmount=df['TotalAmount'], Quantity=df['Quantity']) \
+        .groupby(CUBE_KEYS)[['TotalAmount', 'Quantity']].sum()
+
+
+def _cube_distinct(df):
+    """
+    A chunk's share of the cube's distinct counts. These do not fold like sums
+    (an invoice can straddle two chunks), so the distinct (month, country, id)
+    rows are passed to a DistinctCounter instead: one per invoice or
+    customer-month, not per line. Rows without a month are in no cube cell.
+    """
+    keys = _cube_keys(df)
+    invoices = keys.assign(Id=df['InvoiceNo']).dropna().drop_duplicates()
+    customers = keys.assign(Id=df['CustomerID']).dropna().drop_duplicates()
+    return invoices, customers
+
+
+def _cube_from_parts(sums, invoices, customers):
+    """The cube from folded sums and the DistinctCounters of invoices and customers"""
+    cube = sums.assign(
+        Invoices=invoices.series().reindex(sums.index, fill_value=0).to_numpy(),
+        # Countries with only guest checkouts in a month have no customer rows
+        Customers=customers.series().reindex(sums.index, fill_value=0).to_numpy(),
+    )
+    return cube.sort_index()
+
+
+def summarize_chunk(raw, cleaned):
+    """StreamSummary of one chunk; `raw` must have its InvoiceDate parsed"""
+    dates = raw['InvoiceDate']
+    first, last = dates.min(), dates.max()
+    return StreamSummary(len(raw), raw.shape[1], len(cleaned),
+                         None if pd.isna(first) else str(first), None if pd.isna(last) else str(last))
+
+
+def _date_bound(pick, running, partial):
+    # The dates are str(Timestamp), whose text order is time order
+    if running is None or partial is None:
+        return partial if running is None else running
+    return pick(running, partial)
+
+
+def merge_summaries(running, partial):
+    """Fold one chunk's StreamSummary into the running one; empty chunks change nothing"""
+    if partial.rows == 0:
+        return running
+    if running.rows == 0:
+        return partial
+    return StreamSummary(
+        rows=running.rows + partial.rows,
+        columns=partial.columns,
+        rows_kept=running.rows_kept + partial.rows_kept,
+        first_date=_date_bound(min, running.first_date, partial.first_date),
+        last_date=_date_bound(max, running.last_date, partial.last_date),
+    )
+
+
+def clean_chunks(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield (cleaned chunk, StreamSummary of that chunk) for each `chunksize` rows of the CSV"""
+    for raw in _raw_chunks(path, chunksize):
+        if not pd.api.types.is_datetime64_any_dtype(raw['InvoiceDate']):
+            # Parsed before cleaning so the summary's date range covers every raw row
+            raw['InvoiceDate'] = parse_invoice_dates(raw['InvoiceDate'])
+        cleaned = clean(raw)
+        yield cleaned, summarize_chunk(raw, cleaned)
+
+
+def stream_aggregates(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Same result as aggregate(clean(read_csv(path))) without ever holding the
+    full file: each chunk of `chunksize` rows is cleaned and reduced to
+    per-product sums and cube parts, which are folded into running totals.
+    Memory is bounded by the chunk size plus the aggregates (one row per product
+    and per month x country, and one set entry per invoice and customer-month
+    for the distinct counts). Returns (StoryAggregates, StreamSummary).
+    """
+    sums, products = empty_totals()
+    summary = EMPTY_SUMMARY
+    invoices, customers = DistinctCounter(), DistinctCounter()
+    for chunk, chunk_summary in clean_chunks(path, chunksize):
+        summary = merge_summaries(summary, chunk_summary)
+        sums = fold_totals(sums, cube_sums(chunk))
+        chunk_invoices, chunk_customers = _cube_distinct(chunk)
+        invoices.add(chunk_invoices)
+        customers.add(chunk_customers)
+        products = fold_totals(products, product_totals(chunk))
+
+    cube = _cube_from_parts(sums, invoices, customers)
+    return from_totals(cube, products), summary
+
+
+# ================================================================================
+# PERSISTED CUBE
+# ================================================================================
+
+# The stored cube is rebuilt when this module (how the cube is computed) changes
+CUBE_KEY = source_digest(__file__)
+
+
+def save_cube(cube, path=CSV_PATH):
+    """Keep the cube next to the CSV at `path` (.story_cache/<CSV name>/cube.parquet)"""
+    return story_cache.store(path, 'cube', cube, key=CUBE_KEY)
+
+
+def load_cube(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    The month x country cube for the CSV at `path`: read back from disk if the
+    CSV is unchanged since it was saved, otherwise streamed from the CSV and saved
+    """
+    cube = story_cache.load(path, 'cube', key=CUBE_KEY)
+    if cube is None:
+        aggregates, _ = stream_aggregates(path, chunksize)
+        cube = aggregates.cube
+        save_cube(cube, path)
+    return cube
@@ -0,0 +1,130 @@
+"""
+Story State - Checkpointed running totals for incremental (append) runs
+Each new export is streamed once and folded into month x country and
+per-product sums kept on disk, so adding a day of data costs time in
+proportion to that day's file, not to the whole history
+
+The state holds sums only (revenue and quantity per month and country and per
+Description), plus the top months. Distinct invoice and customer counts are
+left out: keeping them exact would mean carrying every invoice seen so far.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from marketing_analytics.disk_cache import file_state, parquet_available, write_json
+from story_data import (
+    DEFAULT_CHUNKSIZE,
+    EMPTY_SUMMARY,
+    StreamSummary,
+    clean_chunks,
+    cube_sums,
+    empty_totals,
+    fold_totals,
+    from_totals,
+    merge_summaries,
+    monthly_sales,
+    product_totals,
+)
+
+STATE_DIR_NAME = '.story_state'
+STATE_FILE = 'state.json'
+STATE_VERSION = 2
+TOP_MONTHS = 3
+
+
+@dataclass(frozen=True)
+class StoryState:
+    sums: pd.DataFrame               # TotalAmount, Quantity by (MonthCode, Country)
+    products: pd.DataFrame           # TotalAmount, Quantity by Description
+    summary: StreamSummary           # Raw/kept rows and date range over every merged file
+    files: tuple = ()                # {path, size, mtime_ns} of each merged file, in merge order
+
+    @property
+    def empty(self):
+        return self.sums.empty
+
+    def top_months(self, n=TOP_MONTHS):
+        """[(month 'YYYY-MM', TotalAmount)] for the n best months so far"""
+        if self.empty:
+            return []
+        best = monthly_sales(self.sums).nlargest(n, 'TotalAmount')
+        return [(str(month), float(total)) for month, total in zip(best['Month'], best['TotalAmount'])]
+
+
+EMPTY_STATE = StoryState(*empty_totals(), summary=EMPTY_SUMMARY)
+
+
+def file_id(path):
+    return {'path': str(Path(path).resolve()), **file_state(path)}
+
+
+def is_merged(state, path):
+    """True if this exact file (same path, size and mtime) is already in the state"""
+    return file_id(path) in state.files
+
+
+def merge_file(state, path, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream the export at `path` and fold it into `state`; returns the new state"""
+    sums, products, summary = state.sums, state.products, state.summary
+    for chunk, chunk_summary in clean_chunks(path, chunksize):
+        summary = merge_summaries(summary, chunk_summary)
+        sums = fold_totals(sums, cube_sums(chunk))
+        products = fold_totals(products, product_totals(chunk))
+    return StoryState(sums.sort_index(), products, summary, state.files + (file_id(path),))
+
+
+def aggregates(state):
+    """StoryAggregates for everything merged so far; the cube has the sum columns only"""
+    return from_totals(state.sums, state.products)
+
+
+def load_state(directory=STATE_DIR_NAME):
+    """The last checkpoint in `directory`, or EMPTY_STATE if there is none"""
+    directory = Path(directory)
+    try:
+        with open(directory / STATE_FILE, encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return EMPTY_STATE
+    if manifest.get('version') != STATE_VERSION:
+        raise ValueError(f'{directory / STATE_FILE} was written by an incompatible version; '
+                         'remove the directory and append the full history again')
+    return StoryState(
+        sums=pd.read_parquet(directory / manifest['sums']),
+        products=pd.read_parquet(directory / manifest['products']),
+        summary=StreamSummary(**manifest['summary']),
+        files=tuple(manifest['files']),
+    )
+
+
+def save_state(state, directory=STATE_DIR_NAME):
+    """
+    Checkpoint `state` to `directory`. The frames go to new Parquet files named
+    after the merge count, and state.json is replaced last, so an interrupted
+    save leaves the previous checkpoint intact.
+    """
+    if not parquet_available():
+        raise RuntimeError('append mode stores its state as Parquet; install pyarrow')
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    generation = len(state.files)
+    files = {'sums': f'sums-{generation}.parquet', 'products': f'products-{generation}.parquet'}
+    state.sums.to_parquet(directory / files['sums'])
+    state.products.to_parquet(directory / files['products'])
+
+    manifest = {
+        'version': STATE_VERSION,
+        **files,
+        'summary': asdict(state.summary),
+        'top_months': [{'month': month, 'total_amount': total} for month, total in state.top_months()],
+        'files': list(state.files),
+    }
+    write_json(directory / STATE_FILE, manifest)
+
+    for stale in directory.glob('*.parquet'):
+        if stale.name not in files.values():
+            stale.unlink()
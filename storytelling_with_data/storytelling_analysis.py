@@ -1,241 +1,234 @@
 """
 Ecommerce Data Storytelling Analysis
 Visual story about UK online gift retailer
+
+Usage:
+    python storytelling_analysis.py                      # load the CSV in memory
+    python storytelling_analysis.py --chunksize 1000000  # stream exports too big for RAM
+    python storytelling_analysis.py --top 12 --gif story.gif --pdf story.pdf
+    python storytelling_analysis.py --append export-2011-12-10.csv  # fold a new export into saved totals
 """
 
+import argparse
 import sys
-import io
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from datetime import datetime
-
-# Configure UTF-8 output for Windows
-if sys.platform == 'win32':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-# Color scheme
-COLOR_BASE = '#009999'  # Teal
-COLOR_HIGHLIGHT = '#663399'  # Dark purple (complementary)
-
-print("Loading ecommerce data...")
-df = pd.read_csv('Ecommerce Dataset - data.csv')
-
-print(f"\nDataset shape: {df.shape}")
-print(f"Date range: {df['InvoiceDate'].min()} to {df['InvoiceDate'].max()}")
-print("\nFirst few rows:")
-print(df.head())
-print("\nColumn info:")
-print(df.info())
-
-# Clean data
-print("\nCleaning data...")
-# Remove cancelled orders (InvoiceNo starting with 'C')
-df = df[~df['InvoiceNo'].astype(str).str.startswith('C')]
-# Remove negative quantities and zero prices
-df = df[(df['Quantity'] > 0) & (df['UnitPrice'] > 0)]
-# Calculate total amount
-df['TotalAmount'] = df['Quantity'] * df['UnitPrice']
-
-# Parse dates
-df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
-df['Month'] = df['InvoiceDate'].dt.to_period('M')
-df['MonthName'] = df['InvoiceDate'].dt.strftime('%B')
-df['Year'] = df['InvoiceDate'].dt.year
-
-print(f"\nAfter cleaning: {df.shape[0]} rows")
-
-# ================================================================================
-# STORY EXPLORATION
-# ================================================================================
-
-print("\n" + "="*80)
-print("EXPLORING THE DATA FOR STORY")
-print("="*80)
-
-# 1. Monthly sales trend (Seasonality)
-monthly_sales = df.groupby('Month')['TotalAmount'].sum().reset_index()
-monthly_sales['MonthDate'] = monthly_sales['Month'].dt.to_timestamp()
-print("\nMonthly Sales:")
-print(monthly_sales)
-
-# Find peak months
-top_3_months = monthly_sales.nlargest(3, 'TotalAmount')
-print(f"\nTop 3 months by sales:")
-print(top_3_months)
-
-# 2. Top products by revenue
-product_sales = df.groupby('Description')['TotalAmount'].sum().sort_values(ascending=False)
-print(f"\nTop 10 Products by Revenue:")
-print(product_sales.head(10))
-
-# 3. Top products by quantity sold
-product_quantity = df.groupby('Description')['Quantity'].sum().sort_values(ascending=False)
-print(f"\nTop 10 Products by Quantity:")
-print(product_quantity.head(10))
-
-# ================================================================================
-# STORY: "When Do Gift Shoppers Buy?"
-# We'll focus on seasonality - showing which months are busiest
-# ================================================================================
-
-print("\n" + "="*80)
-print("CREATING VISUAL STORY: WHEN DO GIFT SHOPPERS BUY?")
-print("="*80)
-
-# Prepare monthly data with month names
-monthly_data = df.groupby([df['InvoiceDate'].dt.to_period('M')])['TotalAmount'].sum().reset_index()
-monthly_data['MonthDate'] = monthly_data['InvoiceDate'].dt.to_timestamp()
-monthly_data['MonthName'] = monthly_data['MonthDate'].dt.strftime('%b %Y')
-monthly_data = monthly_data.sort_values('MonthDate')
-
-# Get top 3 months
-sorted_by_sales = monthly_data.sort_values('TotalAmount', ascending=False)
-top_month_1 = sorted_by_sales.iloc[0]['MonthDate']
-top_month_2 = sorted_by_sales.iloc[1]['MonthDate']
-top_month_3 = sorted_by_sales.iloc[2]['MonthDate']
-
-print(f"\nTop 3 months:")
-print(f"1st: {sorted_by_sales.iloc[0]['MonthName']} - ${sorted_by_sales.iloc[0]['TotalAmount']:,.0f}")
-print(f"2nd: {sorted_by_sales.iloc[1]['MonthName']} - ${sorted_by_sales.iloc[1]['TotalAmount']:,.0f}")
-print(f"3rd: {sorted_by_sales.iloc[2]['MonthName']} - ${sorted_by_sales.iloc[2]['TotalAmount']:,.0f}")
-
-# ================================================================================
-# VISUALIZATION 1: Highlight the #1 month (November 2011)
-# ================================================================================
-
-plt.rcParams['figure.figsize'] = (14, 7)
-plt.rcParams['font.size'] = 11
-
-fig, ax = plt.subplots(figsize=(14, 7))
-
-# Create colors array - highlight only the top month
-colors = [COLOR_HIGHLIGHT if date == top_month_1 else COLOR_BASE
-          for date in monthly_data['MonthDate']]
-
-bars = ax.bar(monthly_data['MonthName'], monthly_data['TotalAmount'],
-              color=colors, edgecolor='black', linewidth=1)
-
-ax.set_ylabel('Total Sales (£)', fontsize=14, fontweight='bold')
-ax.set_xlabel('Month', fontsize=14, fontweight='bold')
-ax.set_title('When Do Gift Shoppers Buy?', fontsize=18, fontweight='bold', pad=20)
-ax.tick_params(axis='x', rotation=45)
-
-# Add value labels on bars
-for bar in bars:
-    height = bar.get_height()
-    if height > 0:
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'£{height/1000:.0f}K',
-                ha='center', va='bottom', fontsize=9, fontweight='bold')
-
-ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'£{x/1000:.0f}K'))
-ax.grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('story_visual_1.png', dpi=300, bbox_inches='tight')
-print("\n✓ Saved: story_visual_1.png (November highlighted)")
-plt.close()
-
-# ================================================================================
-# VISUALIZATION 2: Highlight the #2 month (October 2011)
-# ================================================================================
-
-fig, ax = plt.subplots(figsize=(14, 7))
-
-# Create colors array - highlight only the 2nd top month
-colors = [COLOR_HIGHLIGHT if date == top_month_2 else COLOR_BASE
-          for date in monthly_data['MonthDate']]
-
-bars = ax.bar(monthly_data['MonthName'], monthly_data['TotalAmount'],
-              color=colors, edgecolor='black', linewidth=1)
-
-ax.set_ylabel('Total Sales (£)', fontsize=14, fontweight='bold')
-ax.set_xlabel('Month', fontsize=14, fontweight='bold')
-ax.set_title('When Do Gift Shoppers Buy?', fontsize=18, fontweight='bold', pad=20)
-ax.tick_params(axis='x', rotation=45)
-
-# Add value labels on bars
-for bar in bars:
-    height = bar.get_height()
-    if height > 0:
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'£{height/1000:.0f}K',
-                ha='center', va='bottom', fontsize=9, fontweight='bold')
-
-ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'£{x/1000:.0f}K'))
-ax.grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('story_visual_2.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: story_visual_2.png (October highlighted)")
-plt.close()
-
-# ================================================================================
-# VISUALIZATION 3: Highlight the #3 month (September 2011)
-# ================================================================================
-
-fig, ax = plt.subplots(figsize=(14, 7))
-
-# Create colors array - highlight only the 3rd top month
-colors = [COLOR_HIGHLIGHT if date == top_month_3 else COLOR_BASE
-          for date in monthly_data['MonthDate']]
-
-bars = ax.bar(monthly_data['MonthName'], monthly_data['TotalAmount'],
-              color=colors, edgecolor='black', linewidth=1)
-
-ax.set_ylabel('Total Sales (£)', fontsize=14, fontweight='bold')
-ax.set_xlabel('Month', fontsize=14, fontweight='bold')
-ax.set_title('When Do Gift Shoppers Buy?', fontsize=18, fontweight='bold', pad=20)
-ax.tick_params(axis='x', rotation=45)
-
-# Add value labels on bars
-for bar in bars:
-    height = bar.get_height()
-    if height > 0:
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'£{height/1000:.0f}K',
-                ha='center', va='bottom', fontsize=9, fontweight='bold')
-
-ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'£{x/1000:.0f}K'))
-ax.grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('story_visual_3.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: story_visual_3.png (September highlighted)")
-plt.close()
-
-# ================================================================================
-# STORY INSIGHTS FOR HTML
-# ================================================================================
-
-print("\n" + "="*80)
-print("STORY SUMMARY")
-print("="*80)
-
-# Calculate insights
-nov_sales = sorted_by_sales.iloc[0]['TotalAmount']
-oct_sales = sorted_by_sales.iloc[1]['TotalAmount']
-sep_sales = sorted_by_sales.iloc[2]['TotalAmount']
-
-total_annual = monthly_data['TotalAmount'].sum()
-top_3_total = nov_sales + oct_sales + sep_sales
-top_3_percent = (top_3_total / total_annual) * 100
-
-print(f"\n📊 KEY INSIGHTS:")
-print(f"   Top month: {sorted_by_sales.iloc[0]['MonthName']} (£{nov_sales:,.0f})")
-print(f"   2nd month: {sorted_by_sales.iloc[1]['MonthName']} (£{oct_sales:,.0f})")
-print(f"   3rd month: {sorted_by_sales.iloc[2]['MonthName']} (£{sep_sales:,.0f})")
-print(f"   Top 3 months = {top_3_percent:.1f}% of annual sales")
-print(f"\n💡 STORY ANGLE:")
-print(f"   Gift shoppers prepare for the holidays!")
-print(f"   Sales peak in fall as customers stock up for the holiday season.")
-
-print("\n" + "="*80)
-print("ANALYSIS COMPLETE!")
-print("="*80)
-print("\nGenerated Files:")
-print("  1. story_visual_1.png (November highlighted)")
-print("  2. story_visual_2.png (October highlighted)")
-print("  3. story_visual_3.png (September highlighted)")
-print("="*80)
+from pathlib import Path
+
+# Entry script: put the repo root on sys.path so the project modules can import
+# the shared marketing_analytics package
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+from marketing_analytics import instrumentation, runtime  # noqa: E402
+
+# Same as story_state.STATE_DIR_NAME, repeated so --help needs no pandas
+STATE_DIR_NAME = '.story_state'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Seasonality story for the UK gift retailer')
+    parser.add_argument('--chunksize', type=int, metavar='ROWS',
+                        help='stream the CSV in chunks of ROWS rows, cleaning and aggregating each '
+                             'chunk, instead of loading it whole')
+    parser.add_argument('--top', type=int, default=3, metavar='N',
+                        help='save story_visual_1..N.png, highlighting the N best months in turn (default: 3)')
+    parser.add_argument('--gif', metavar='PATH', help='also write the highlight sequence as an animated GIF')
+    parser.add_argument('--pdf', metavar='PATH', help='also write the highlight sequence as a multi-page PDF')
+    parser.add_argument('--append', nargs='+', metavar='CSV',
+                        help='merge each export (same columns as the main CSV) into the saved running totals, '
+                             'checkpointing after each, and tell the story from those totals')
+    parser.add_argument('--state', default=STATE_DIR_NAME, metavar='DIR',
+                        help=f'where --append keeps its running totals (default: {STATE_DIR_NAME})')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # pandas and matplotlib come in with the story modules, so --help and usage errors return at once
+    import story_state
+    from marketing_analytics.figure_cache import discard
+    from story_charts import render_highlights
+    from story_data import CSV_PATH, DEFAULT_CHUNKSIZE, aggregate, clean, load_data, save_cube, stream_aggregates
+
+    print("Loading ecommerce data...")
+    if args.append:
+        # Append mode: only the new exports are read; everything earlier comes from the checkpoint
+        instrumentation.begin("Loading ecommerce data...")
+        state = story_state.load_state(args.state)
+        for path in args.append:
+            if story_state.is_merged(state, path):
+                print(f"Already merged: {path}")
+                continue
+            with instrumentation.span(f'merge {path}'):
+                state = story_state.merge_file(state, path, args.chunksize or DEFAULT_CHUNKSIZE)
+            story_state.save_state(state, args.state)
+            print(f"Merged: {path} (checkpoint {len(state.files)} saved to {args.state})")
+        instrumentation.end()
+
+        summary = state.summary
+        print(f"\nDataset shape: ({summary.rows}, {summary.columns})")
+        print(f"Date range: {summary.first_date} to {summary.last_date}")
+        print(f"\nRunning totals cover {len(state.files)} merged export(s)")
+        print(f"\nAfter cleaning: {summary.rows_kept} rows")
+        aggregates = story_state.aggregates(state)
+    elif args.chunksize:
+        # Streaming mode: the full frame is never built, so the raw-row preview is skipped
+        instrumentation.begin("Loading ecommerce data...")
+        aggregates, summary = stream_aggregates(CSV_PATH, args.chunksize)
+        instrumentation.end()
+
+        print(f"\nDataset shape: ({summary.rows}, {summary.columns})")
+        print(f"Date range: {summary.first_date} to {summary.last_date}")
+        print(f"\nStreamed in chunks of {args.chunksize:,} rows; each chunk was cleaned and aggregated")
+        print(f"\nAfter cleaning: {summary.rows_kept} rows")
+    else:
+        instrumentation.begin("Loading ecommerce data...")
+        df = load_data(CSV_PATH)
+        instrumentation.end()
+
+        print(f"\nDataset shape: {df.shape}")
+        print(f"Date range: {df['InvoiceDate'].min()} to {df['InvoiceDate'].max()}")
+        print("\nFirst few rows:")
+        print(df.head())
+        print("\nColumn info:")
+        print(df.info())
+
+        # Clean data
+        print("\nCleaning data...")
+        instrumentation.begin("Cleaning data...")
+        df = clean(df)
+        instrumentation.end()
+
+        print(f"\nAfter cleaning: {df.shape[0]} rows")
+        aggregates = aggregate(df)
+
+    if not args.append:
+        # Keep the month x country cube so per-country variants can slice it without the CSV
+        save_cube(aggregates.cube, CSV_PATH)
+
+    # ================================================================================
+    # STORY EXPLORATION
+    # ================================================================================
+
+    print("\n" + "="*80)
+    print("EXPLORING THE DATA FOR STORY")
+    print("="*80)
+    instrumentation.begin("EXPLORING THE DATA FOR STORY")
+
+    # 1. Monthly sales trend (Seasonality)
+    monthly_sales = aggregates.monthly_sales
+    print("\nMonthly Sales:")
+    print(monthly_sales)
+
+    # Find peak months
+    top_3_months = monthly_sales.nlargest(3, 'TotalAmount')
+    print(f"\nTop 3 months by sales:")
+    print(top_3_months)
+
+    # 2. Top products by revenue
+    product_sales = aggregates.top_products('TotalAmount', 10)
+    print(f"\nTop 10 Products by Revenue:")
+    print(product_sales)
+
+    # 3. Top products by quantity sold
+    product_quantity = aggregates.top_products('Quantity', 10)
+    print(f"\nTop 10 Products by Quantity:")
+    print(product_quantity)
+    instrumentation.end()
+
+    # ================================================================================
+    # STORY: "When Do Gift Shoppers Buy?"
+    # We'll focus on seasonality - showing which months are busiest
+    # ================================================================================
+
+    print("\n" + "="*80)
+    print("CREATING VISUAL STORY: WHEN DO GIFT SHOPPERS BUY?")
+    print("="*80)
+    instrumentation.begin("CREATING VISUAL STORY: WHEN DO GIFT SHOPPERS BUY?")
+
+    # Prepare monthly data with month names
+    monthly_data = monthly_sales.copy()
+    monthly_data['MonthName'] = monthly_data['MonthDate'].dt.strftime('%b %Y')
+    monthly_data = monthly_data.sort_values('MonthDate')
+
+    sorted_by_sales = monthly_data.sort_values('TotalAmount', ascending=False)
+    # Fewer than three rows when the exports hold under three months (or none at all)
+    top_3 = sorted_by_sales.head(3)
+
+    print(f"\nTop 3 months:")
+    for ordinal, row in zip(['1st', '2nd', '3rd'], top_3.itertuples()):
+        print(f"{ordinal}: {row.MonthName} - ${row.TotalAmount:,.0f}")
+
+    # ================================================================================
+    # VISUALIZATIONS: the same monthly chart, highlighting one top month at a time
+    # ================================================================================
+
+    # The chart is drawn once and recolored for each highlighted month (see story_charts.py)
+    top_months = list(sorted_by_sales['MonthDate'].head(args.top))
+    visuals = [(f'story_visual_{rank}.png', f"{month:%B} highlighted")
+               for rank, month in enumerate(top_months, start=1)]
+
+    saved = render_highlights(monthly_data, top_months, [path for path, _ in visuals],
+                              gif_path=args.gif, pdf_path=args.pdf)
+    print()
+    for (path, rendered), (_, label) in zip(saved, visuals):
+        print(f"✓ {'Saved' if rendered else 'Unchanged'}: {path} ({label})")
+    for extra in (args.gif, args.pdf):
+        if extra:
+            print(f"✓ Saved: {extra} ({len(visuals)} highlighted months)")
+    # Visuals ranked past this run's --top are left from a larger earlier run
+    for path in sorted(Path('.').glob('story_visual_*.png')):
+        rank = path.stem.rsplit('_', 1)[-1]
+        if rank.isdigit() and int(rank) > len(visuals):
+            discard(path)
+            print(f"✓ Removed: {path} (beyond the top {len(visuals)})")
+    instrumentation.end()
+
+    # ================================================================================
+    # STORY INSIGHTS FOR HTML
+    # ================================================================================
+
+    print("\n" + "="*80)
+    print("STORY SUMMARY")
+    print("="*80)
+
+    # Calculate insights
+    total_annual = monthly_data['TotalAmount'].sum()
+    top_3_total = top_3['TotalAmount'].sum()
+
+    print(f"\n📊 KEY INSIGHTS:")
+    if top_3.empty:
+        print(f"   No sales left after cleaning; there is no story to tell yet.")
+    else:
+        for label, row in zip(['Top month', '2nd month', '3rd month'], top_3.itertuples()):
+            print(f"   {label}: {row.MonthName} (£{row.TotalAmount:,.0f})")
+        print(f"   Top 3 months = {top_3_total / total_annual * 100:.1f}% of annual sales")
+        print(f"\n💡 STORY ANGLE:")
+        print(f"   Gift shoppers prepare for the holidays!")
+        print(f"   Sales peak in fall as customers stock up for the holiday season.")
+
+    print("\n" + "="*80)
+    print("ANALYSIS COMPLETE!")
+    print("="*80)
+    print("\nGenerated Files:")
+    for number, (path, label) in enumerate(visuals, start=1):
+        print(f"  {number}. {path} ({label})")
+    for extra in (args.gif, args.pdf):
+        if extra:
+            print(f"  {extra}")
+    print("="*80)
+
+
+def run(argv=None):
+    """Command-line entry point, shared by this script and `marketing-analytics story`"""
+    # Per-stage timing/memory report when MARKETING_ANALYTICS_PROFILE is set
+    instrumentation.enable_from_env('storytelling_analysis')
+    # The report is written even when the run fails, with the spans recorded so far
+    try:
+        main(argv)
+    finally:
+        instrumentation.finish()
+
+
+if __name__ == '__main__':
+    runtime.utf8_stdout()
+    run()